@@ -5,6 +5,7 @@ This package handles database connection and document models.
 """
 
 from db.database import connect_db, disconnect_db
+from db.background import enable_queue_logging, flush_writes
 from db.models import Spreadsheet, Cell
 
-__all__ = ['connect_db', 'disconnect_db', 'Spreadsheet', 'Cell'] 
\ No newline at end of file
+__all__ = ['connect_db', 'disconnect_db', 'enable_queue_logging', 'flush_writes', 'Spreadsheet', 'Cell'] 
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Background I/O for the database package.
+
+This module moves bulk MongoDB writes and log handler I/O off the caller's
+thread, so parsing and the LLM pipeline are not stalled by network or disk.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Any, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Maximum number of pending bulk writes before callers fall back to writing inline
+WRITE_QUEUE_SIZE = 10000
+
+_write_queue: "queue.Queue" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+_writer_thread: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+# First exception raised by a queued bulk write, re-raised by flush_writes()
+_write_error: Optional[BaseException] = None
+
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _run_bulk_write(collection: Any, operations: List[Any], ordered: bool) -> None:
+    """Execute a queued bulk write, keeping the first failure for flush_writes() to raise."""
+    global _write_error
+    try:
+        collection.bulk_write(operations, ordered=ordered, bypass_document_validation=True)
+    except Exception as e:
+        logger.error("Background bulk write to '%s' failed: %s", collection.name, e)
+        if _write_error is None:
+            _write_error = e
+
+
+def _drain_write_queue() -> None:
+    """Worker loop that executes queued bulk writes in submission order."""
+    while True:
+        collection, operations, ordered = _write_queue.get()
+        try:
+            _run_bulk_write(collection, operations, ordered)
+        finally:
+            _write_queue.task_done()
+
+
+def _ensure_writer() -> None:
+    """Start the background writer thread if it is not running yet."""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(
+                target=_drain_write_queue, name="db-bulk-writer", daemon=True
+            )
+            _writer_thread.start()
+            # Do not lose queued writes when the interpreter exits
+            atexit.register(flush_writes)
+
+
+def enqueue_bulk_write(collection: Any, operations: List[Any], ordered: bool = False) -> None:
+    """
+    Queue a bulk write to be executed by the background writer thread.
+
+    Writes are executed one at a time in the order they were queued, so a
+    delete queued before an insert is applied first. If the queue is full
+    the write is executed on the caller's thread instead.
+
+    Args:
+        collection: The PyMongo collection to write to.
+        operations: List of PyMongo write operations (InsertOne, DeleteMany, ...).
+        ordered: Whether MongoDB should apply the operations in order.
+    """
+    if not operations:
+        return
+    _ensure_writer()
+    try:
+        _write_queue.put_nowait((collection, operations, ordered))
+    except queue.Full:
+        # Wait for the queued writes so ordering is preserved, then write inline
+        flush_writes()
+        collection.bulk_write(operations, ordered=ordered, bypass_document_validation=True)
+
+
+def flush_writes() -> None:
+    """
+    Block until every queued bulk write has been executed.
+
+    Raises:
+        Exception: The first error raised by a queued write since the last
+            flush, e.g. a DuplicateKeyError or a BSON encoding error.
+    """
+    global _write_error
+    _write_queue.join()
+    error, _write_error = _write_error, None
+    if error is not None:
+        raise error
+
+
+class _RootDispatchHandler(logging.Handler):
+    """Hand records to the root logger's handlers, as propagation would."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger().callHandlers(record)
+
+
+def enable_queue_logging(logger_name: str = "db") -> None:
+    """
+    Route records of the given logger through a queue to a listener thread.
+
+    This is opt-in: importing db does not enable it, so callers must call it
+    explicitly, once, at application startup. It changes how the logger's
+    records reach the root handlers.
+
+    The logger gets a QueueHandler and stops propagating; the listener thread
+    then dispatches each record to the root logger's handlers, so output is
+    unchanged but no handler does I/O on the caller's thread.
+
+    Args:
+        logger_name: Name of the logger to route through the queue.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_queue: "queue.Queue" = queue.Queue(-1)
+    package_logger = logging.getLogger(logger_name)
+    package_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    package_logger.propagate = False
+
+    _log_listener = logging.handlers.QueueListener(log_queue, _RootDispatchHandler())
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
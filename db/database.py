@@ -19,23 +19,46 @@ MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/excel_llm")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "excel_agents")
 
 
-def connect_db(uri: Optional[str] = None, db_name: Optional[str] = None) -> None:
+def connect_db(uri: Optional[str] = None, db_name: Optional[str] = None,
+               max_pool_size: int = 50, min_pool_size: int = 5,
+               max_idle_time_ms: int = 60000, server_selection_timeout_ms: int = 3000,
+               compressors: str = "zlib") -> None:
     """
     Connect to MongoDB using MongoEngine.
     
+    The connection pool is shared by every agent coroutine, so it is sized to keep
+    connections warm and reused instead of being re-established per request.
+    
     Args:
         uri: MongoDB connection URI. If None, uses environment variable.
         db_name: Database name. If None, uses environment variable.
+        max_pool_size: Maximum number of pooled connections.
+        min_pool_size: Number of connections kept open while idle.
+        max_idle_time_ms: Time after which an idle pooled connection is closed.
+        server_selection_timeout_ms: Time to wait for a reachable server before failing.
+        compressors: Comma-separated wire compressors in order of preference. The default,
+            zlib, needs no extra package; "zstd" and "snappy" require zstandard and
+            python-snappy, and PyMongo warns on every connect if they are missing.
     """
     try:
         connection_uri = uri or MONGODB_URI
         db = db_name or DATABASE_NAME
         
-        logger.info(f"Connecting to database: {db}")
-        connect(db=db, host=connection_uri)
+        logger.info("Connecting to database: %s", db)
+        connect(
+            db=db,
+            host=connection_uri,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            maxIdleTimeMS=max_idle_time_ms,
+            serverSelectionTimeoutMS=server_selection_timeout_ms,
+            compressors=compressors,
+            w=1,
+            retryWrites=True
+        )
         logger.info("Successfully connected to MongoDB")
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {str(e)}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         raise
 
 
@@ -46,5 +69,5 @@ def disconnect_db() -> None:
         disconnect()
         logger.info("Successfully disconnected from MongoDB")
     except Exception as e:
-        logger.error(f"Error disconnecting from MongoDB: {str(e)}")
+        logger.error("Error disconnecting from MongoDB: %s", e)
         raise 
\ No newline at end of file
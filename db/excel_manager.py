@@ -3,34 +3,72 @@ ExcelDatabase class for managing Excel spreadsheet data in MongoDB.
 """
 
 import logging
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional, List, Union, Dict, Any
+from typing import Optional, List, Tuple, Union, Dict, Any, Iterator
 
 from .database import connect_db, disconnect_db
-from .models import Spreadsheet
+from .background import flush_writes
+from .models import Spreadsheet, Cell
 from parsers.excel_parser import ExcelParser
 
 # Configure logging
 # logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Spreadsheet fields needed to build the dictionary returned by _spreadsheet_to_dict
+SPREADSHEET_DICT_FIELDS = (
+    'name',
+    'original_filename',
+    'file_path',
+    'sheet_names',
+    'active_sheet',
+    'metadata',
+    'created_at',
+    'updated_at'
+)
+
+# Maximum number of distinct queries remembered by the read caches
+QUERY_CACHE_SIZE = 128
+
+# Cell fields returned by get_sheet_data
+SHEET_CELL_FIELDS = (
+    'row',
+    'column',
+    'value',
+    'formatted_value',
+    'formula',
+    'data_type',
+    'cell_type'
+)
+
 class ExcelDatabase:
     """
     A class to manage Excel spreadsheet data in MongoDB.
     Provides methods for loading spreadsheets and querying cell data.
     """
     
-    def __init__(self, spreadsheet_path: Union[str, Path], auto_connect: bool = True):
+    def __init__(self, spreadsheet_path: Union[str, Path], auto_connect: bool = True,
+                 background_writes: bool = False):
         """
         Initialize the ExcelDatabase with a spreadsheet path.
         
         Args:
             spreadsheet_path: Path to the Excel spreadsheet
             auto_connect: Whether to automatically connect to the database (default: True)
+            background_writes: Whether parsed cells are written to MongoDB by the
+                background writer thread (default: False). Parsing still waits for
+                the writes, so load_spreadsheet fails if any of them failed.
         """
         self.spreadsheet_path = Path(spreadsheet_path)
+        self.background_writes = background_writes
         self.spreadsheet = None
         self.parser = None
+        self._cells_by_sheet = {}  # Maps sheet name -> {cell reference -> Cell}, built by load_spreadsheet
+        
+        # Per-instance caches for the read methods, cleared whenever the stored data changes
+        self._spreadsheet_data_cache = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._query_spreadsheet_data)
+        self._sheet_data_cache = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._build_sheet_data)
         
         if auto_connect:
             self.connect()
@@ -41,6 +79,9 @@ class ExcelDatabase:
     
     def disconnect(self) -> None:
         """Disconnect from the MongoDB database."""
+        if self.spreadsheet:
+            self.spreadsheet.flush_access_times()
+        flush_writes()
         disconnect_db()
     
     def load_spreadsheet(self) -> bool:
@@ -51,21 +92,24 @@ class ExcelDatabase:
             bool: True if successful, False otherwise
         """
         if not self.spreadsheet_path.exists():
-            logger.error(f"Spreadsheet not found: {self.spreadsheet_path}")
+            logger.error("Spreadsheet not found: %s", self.spreadsheet_path)
             return False
         
         try:
-            logger.info(f"Parsing spreadsheet: {self.spreadsheet_path}")
-            self.parser = ExcelParser(str(self.spreadsheet_path))
+            logger.info("Parsing spreadsheet: %s", self.spreadsheet_path)
+            self.parser = ExcelParser(str(self.spreadsheet_path), background_writes=self.background_writes)
             self.spreadsheet = self.parser.parse()
+            self._cells_by_sheet = self._index_cells_by_sheet()
+            self._clear_caches()
             
             # Display information about the parsed spreadsheet
-            logger.info(f"Parsed spreadsheet: {self.spreadsheet.name}")
-            logger.info(f"Number of cells: {len(self.spreadsheet.cells)}")
-            logger.info(f"Sheets: {', '.join(self.spreadsheet.sheet_names)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Parsed spreadsheet: %s", self.spreadsheet.name)
+                logger.info("Number of cells: %d", len(self.spreadsheet.cells))
+                logger.info("Sheets: %s", ', '.join(self.spreadsheet.sheet_names))
             return True
         except Exception as e:
-            logger.error(f"Error processing {self.spreadsheet_path.name}: {str(e)}")
+            logger.error("Error processing %s: %s", self.spreadsheet_path.name, e)
             return False
     
     def delete_spreadsheet(self, name: Optional[str] = None, filename: Optional[str] = None) -> bool:
@@ -84,6 +128,9 @@ class ExcelDatabase:
             return False
             
         try:
+            # Make sure queued cell writes land before they are deleted
+            flush_writes()
+            
             # Find the spreadsheet to delete
             query = {}
             if name:
@@ -94,30 +141,38 @@ class ExcelDatabase:
             spreadsheet = Spreadsheet.objects(**query).first()
             
             if not spreadsheet:
-                logger.error(f"Spreadsheet not found with query: {query}")
+                logger.error("Spreadsheet not found with query: %s", query)
                 return False
                 
-            # Get the spreadsheet ID before deletion for logging
-            spreadsheet_id = str(spreadsheet.id)
-            spreadsheet_name = spreadsheet.name
-            
-            # Count cells before deletion for logging
-            cell_count = len(spreadsheet.cells)
+            # Collect the details for the log message before deletion, but only
+            # when the message will actually be emitted
+            log_deletion = logger.isEnabledFor(logging.INFO)
+            if log_deletion:
+                spreadsheet_id = str(spreadsheet.id)
+                spreadsheet_name = spreadsheet.name
+                cell_count = spreadsheet.cell_count()
             
             # Delete the spreadsheet which will delete all its reference cells due to
             # the cascade delete behavior defined in the model
             spreadsheet.delete()
+            self._clear_caches()
             
-            logger.info(f"Deleted spreadsheet '{spreadsheet_name}' (ID: {spreadsheet_id}) with {cell_count} cells")
+            if log_deletion:
+                logger.info("Deleted spreadsheet '%s' (ID: %s) with %d cells",
+                            spreadsheet_name, spreadsheet_id, cell_count)
             return True
                 
         except Exception as e:
-            logger.error(f"Error deleting spreadsheet: {str(e)}")
+            logger.error("Error deleting spreadsheet: %s", e)
             return False
     
     def reparse_spreadsheet(self, name: Optional[str] = None, filename: Optional[str] = None) -> bool:
         """
-        Delete an existing spreadsheet from the database and reparse it.
+        Reparse the spreadsheet file and update its stored cells.
+        
+        A stored spreadsheet for the same file is updated in place: its cells are
+        upserted and cells that no longer exist are removed. Any other spreadsheet
+        matching name/filename is deleted before parsing.
         
         Args:
             name: The name of the spreadsheet to reparse
@@ -126,15 +181,32 @@ class ExcelDatabase:
         Returns:
             bool: True if reparsing was successful, False otherwise
         """
-        # Delete the existing spreadsheet if it exists
+        # Delete the existing spreadsheet if it exists and is not the one the
+        # parser will update in place
         if name or filename:
-            deleted = self.delete_spreadsheet(name=name, filename=filename)
-            if not deleted:
-                logger.warning("No existing spreadsheet was deleted. Continuing with parsing.")
+            query = {}
+            if name:
+                query['name'] = name
+            if filename:
+                query['original_filename'] = filename
+            existing = Spreadsheet.objects(**query).only('file_path').first()
+            
+            if not (existing and existing.file_path == str(self.spreadsheet_path)):
+                deleted = self.delete_spreadsheet(name=name, filename=filename)
+                if not deleted:
+                    logger.warning("No existing spreadsheet was deleted. Continuing with parsing.")
         
         # Load the spreadsheet
+        self._clear_caches()
         return self.load_spreadsheet()
     
+    def _clear_caches(self) -> None:
+        """Invalidate the cached read results and sheet properties."""
+        self._spreadsheet_data_cache.cache_clear()
+        self._sheet_data_cache.cache_clear()
+        self.__dict__.pop('sheet_names', None)
+        self.__dict__.pop('active_sheet', None)
+    
     def get_spreadsheet_data(self, name: Optional[str] = None, filename: Optional[str] = None, 
                       limit: int = 10, as_dict: bool = False) -> Union[List[Union[Spreadsheet, Dict[str, Any]]], 
                                                                      Optional[Union[Spreadsheet, Dict[str, Any]]]]:
@@ -144,7 +216,7 @@ class ExcelDatabase:
         Args:
             name: Filter by spreadsheet name
             filename: Filter by original filename
-            limit: Maximum number of results to return (when returning multiple)
+            limit: Maximum number of most recently created results to return (when returning multiple)
             as_dict: Whether to return results as dictionaries instead of Spreadsheet objects
             
         Returns:
@@ -152,42 +224,62 @@ class ExcelDatabase:
             - If name or filename is specified and as_dict=True: A dictionary or None
             - If neither name nor filename is specified and as_dict=False: A list of Spreadsheet objects
             - If neither name nor filename is specified and as_dict=True: A list of dictionaries
+            
+        Results are cached per (name, filename, limit, as_dict) until the stored
+        spreadsheets change; the returned objects are shared and should not be modified.
         """
         try:
-            # Single spreadsheet lookup
-            if name or filename:
-                query = {}
-                if name:
-                    query['name'] = name
-                if filename:
-                    query['original_filename'] = filename
-                
-                spreadsheet = Spreadsheet.objects(**query).first()
-                
-                if not spreadsheet:
-                    logger.error(f"Spreadsheet not found with query: {query}")
-                    return None
-                
-                if as_dict:
-                    return self._spreadsheet_to_dict(spreadsheet)
-                return spreadsheet
-                
-            # Multiple spreadsheets lookup
-            else:
-                spreadsheets = Spreadsheet.objects.limit(limit)
-                
-                if not spreadsheets:
-                    logger.info("No spreadsheets found in database.")
-                    return []
-                
-                if as_dict:
-                    return [self._spreadsheet_to_dict(s) for s in spreadsheets]
-                return list(spreadsheets)
-                
+            return self._spreadsheet_data_cache(name, filename, limit, as_dict)
         except Exception as e:
-            logger.error(f"Error fetching spreadsheet(s): {str(e)}")
+            logger.error("Error fetching spreadsheet(s): %s", e)
             return None if (name or filename) else []
     
+    def _query_spreadsheet_data(self, name: Optional[str], filename: Optional[str],
+                                limit: int, as_dict: bool) -> Union[List[Union[Spreadsheet, Dict[str, Any]]],
+                                                                    Optional[Union[Spreadsheet, Dict[str, Any]]]]:
+        """
+        Query the database for get_spreadsheet_data. Errors are raised so they are not cached.
+        """
+        # Wait for queued cell writes so the cells collection is up to date
+        flush_writes()
+        
+        # Single spreadsheet lookup
+        if name or filename:
+            query = {}
+            if name:
+                query['name'] = name
+            if filename:
+                query['original_filename'] = filename
+            
+            spreadsheets = Spreadsheet.objects(**query)
+            if as_dict:
+                # Only load the fields used by the dictionary representation
+                spreadsheets = spreadsheets.only(*SPREADSHEET_DICT_FIELDS)
+            spreadsheet = spreadsheets.first()
+            
+            if not spreadsheet:
+                logger.error("Spreadsheet not found with query: %s", query)
+                return None
+            
+            if as_dict:
+                return self._spreadsheet_to_dict(spreadsheet)
+            return spreadsheet
+            
+        # Multiple spreadsheets lookup
+        else:
+            # Newest first, so the created_at index serves the sort and bounds the scan
+            spreadsheets = Spreadsheet.objects.order_by('-created_at').limit(limit)
+            if as_dict:
+                spreadsheets = spreadsheets.only(*SPREADSHEET_DICT_FIELDS)
+            
+            if not spreadsheets:
+                logger.info("No spreadsheets found in database.")
+                return []
+            
+            if as_dict:
+                return [self._spreadsheet_to_dict(s) for s in spreadsheets]
+            return list(spreadsheets)
+    
     def _spreadsheet_to_dict(self, spreadsheet: Spreadsheet) -> Dict[str, Any]:
         """
         Convert a Spreadsheet object to a dictionary.
@@ -198,13 +290,17 @@ class ExcelDatabase:
         Returns:
             dict: Dictionary representation of the spreadsheet
         """
-        # Create a dictionary of cell references organized by sheet name
-        cell_references_by_sheet = {}
-        for cell in spreadsheet.cells:
-            sheet_name = cell.sheet_name
-            if sheet_name not in cell_references_by_sheet:
-                cell_references_by_sheet[sheet_name] = []
-            cell_references_by_sheet[sheet_name].append(cell.cell_reference)
+        # Group the cell references by sheet name on the server, so only one
+        # small document per sheet crosses the wire instead of every cell
+        pipeline = [
+            {'$match': {'spreadsheet': spreadsheet.pk}},
+            {'$group': {'_id': '$sheet_name', 'cell_references': {'$push': '$cell_reference'}}}
+        ]
+        cell_references_by_sheet = {
+            group['_id']: group['cell_references']
+            for group in Cell._get_collection().aggregate(pipeline)
+        }
+        cell_count = sum(map(len, cell_references_by_sheet.values()))
             
         return {
             'id': str(spreadsheet.id),
@@ -213,7 +309,7 @@ class ExcelDatabase:
             'file_path': spreadsheet.file_path,
             'sheet_names': spreadsheet.sheet_names,
             'active_sheet': spreadsheet.active_sheet,
-            'cell_count': len(spreadsheet.cells),
+            'cell_count': cell_count,
             'cell_references': cell_references_by_sheet,
             'metadata': spreadsheet.metadata,
             'created_at': spreadsheet.created_at,
@@ -238,42 +334,117 @@ class ExcelDatabase:
         try:
             # If sheet_name not provided, use active sheet
             if sheet_name is None:
-                sheet_name = self.spreadsheet.active_sheet
+                sheet_name = self.active_sheet
             
             # Verify that the sheet exists in the spreadsheet
-            if sheet_name not in self.spreadsheet.sheet_names:
-                logger.error(f"Sheet '{sheet_name}' not found in spreadsheet")
+            if sheet_name not in self.sheet_names:
+                logger.error("Sheet '%s' not found in spreadsheet", sheet_name)
                 return None
             
             # Find the cell
             cell = self.spreadsheet.get_cell_by_reference(cell_reference, sheet_name)
             
             if not cell:
-                sheet_info = f" in sheet '{sheet_name}'" if sheet_name else ""
-                logger.error(f"Cell '{cell_reference}'{sheet_info} not found")
+                # Callers probe many references, so a miss is not an error
+                logger.debug("Cell '%s' in sheet '%s' not found", cell_reference, sheet_name)
                 return None
             
             # Return cell data as a dictionary
-            return {
-                'row': cell.row,
-                'column': cell.column,
-                'sheet': cell.sheet_name or sheet_name,
-                'value': cell.value,
-                'formatted_value': cell.formatted_value,
-                'alias': cell.alias,
-                'value_list': cell.value_list,
-                'formula': cell.formula,
-                'data_type': cell.data_type,
-                'cell_type': cell.cell_type,
-                'precedent_cells': cell.precedent_cells,
-                'dependent_cells': cell.dependent_cells,
-                'metadata': cell.metadata
-            }
+            return self._cell_to_dict(cell, sheet_name)
             
         except Exception as e:
-            logger.error(f"Error fetching cell data: {str(e)}")
+            logger.error("Error fetching cell data: %s", e)
             return None
     
+    def get_cells_data(self, cell_references: List[str], sheet_name: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Fetch data for several cells of a sheet at once.
+        
+        Args:
+            cell_references: Excel-style cell references (e.g., ["A1", "B2"])
+            sheet_name: Name of the sheet (defaults to active sheet if None)
+        
+        Returns:
+            dict: Dictionary mapping each cell reference found to its cell data, as
+            returned by get_cell_data. References without a cell are left out.
+        """
+        if not self.spreadsheet:
+            logger.error("No spreadsheet loaded. Call load_spreadsheet() first.")
+            return {}
+            
+        try:
+            # If sheet_name not provided, use active sheet
+            if sheet_name is None:
+                sheet_name = self.active_sheet
+            
+            # Verify that the sheet exists in the spreadsheet
+            if sheet_name not in self.sheet_names:
+                logger.error("Sheet '%s' not found in spreadsheet", sheet_name)
+                return {}
+            
+            cells_data = {}
+            for cell_reference in cell_references:
+                cell = self.spreadsheet.get_cell_by_reference(cell_reference, sheet_name)
+                if cell:
+                    cells_data[cell_reference] = self._cell_to_dict(cell, sheet_name)
+            return cells_data
+            
+        except Exception as e:
+            logger.error("Error fetching cells data: %s", e)
+            return {}
+    
+    def get_cells_bulk(self, sheet_name: Optional[str] = None) -> Iterator[dict]:
+        """
+        Iterate over the cells of a sheet with the fields needed to build a dependency graph.
+        
+        Args:
+            sheet_name: Name of the sheet (defaults to active sheet if None)
+        
+        Yields:
+            dict: Dictionary with the cell's 'cell_ref', 'sheet' and 'precedent_cells'
+        """
+        if not self.spreadsheet:
+            logger.error("No spreadsheet loaded. Call load_spreadsheet() first.")
+            return
+        
+        # If sheet_name not provided, use active sheet
+        if sheet_name is None:
+            sheet_name = self.active_sheet
+        
+        # Verify that the sheet exists in the spreadsheet
+        if sheet_name not in self.sheet_names:
+            logger.error("Sheet '%s' not found in spreadsheet", sheet_name)
+            return
+        
+        # Read the loaded cells in one pass rather than looking up each reference
+        for cell in self.spreadsheet.cells:
+            if cell.sheet_name != sheet_name:
+                continue
+            yield {
+                'cell_ref': cell.cell_reference,
+                'sheet': cell.sheet_name,
+                'precedent_cells': cell.precedent_cells
+            }
+    
+    @staticmethod
+    def _cell_to_dict(cell: Cell, sheet_name: str) -> dict:
+        """Build the dictionary returned for a cell by get_cell_data."""
+        return {
+            'row': cell.row,
+            'column': cell.column,
+            'sheet': cell.sheet_name or sheet_name,
+            'value': cell.value,
+            'formatted_value': cell.formatted_value,
+            'alias': cell.alias,
+            'value_list': cell.value_list,
+            'formula': cell.formula,
+            'data_type': cell.data_type,
+            'cell_type': cell.cell_type,
+            'precedent_cells': cell.precedent_cells,
+            'dependent_cells': cell.dependent_cells,
+            'metadata': cell.metadata
+        }
+    
     def get_sheet_data(self, sheet_name: Optional[str] = None) -> Optional[dict]:
         """
         Get all data from a specific sheet.
@@ -292,48 +463,89 @@ class ExcelDatabase:
         try:
             # If sheet_name not provided, use active sheet
             if sheet_name is None:
-                sheet_name = self.spreadsheet.active_sheet
+                sheet_name = self.active_sheet
             
             # Check if sheet exists
-            if sheet_name not in self.spreadsheet.sheet_names:
-                logger.error(f"Sheet '{sheet_name}' not found in spreadsheet")
+            if sheet_name not in self.sheet_names:
+                logger.error("Sheet '%s' not found in spreadsheet", sheet_name)
                 return None
                 
-            # Get all cells for the given sheet
-            sheet_cells = {}
-            for cell in self.spreadsheet.cells:
-                if cell.sheet_name == sheet_name:
-                    cell_reference = f"{cell.column}{cell.row}"
-                    sheet_cells[cell_reference] = {
-                        'row': cell.row,
-                        'column': cell.column,
-                        'value': cell.value,
-                        'formatted_value': cell.formatted_value,
-                        'formula': cell.formula,
-                        'data_type': cell.data_type,
-                        'cell_type': cell.cell_type
-                    }
-            
-            return {
-                'name': sheet_name,
-                'cells': sheet_cells
-            }
+            return self._sheet_data_cache(sheet_name)
             
         except Exception as e:
-            logger.error(f"Error fetching sheet data: {str(e)}")
+            logger.error("Error fetching sheet data: %s", e)
             return None
     
-    def get_sheet_names(self) -> List[str]:
+    def _build_sheet_data(self, sheet_name: str) -> dict:
         """
-        Get the list of sheet names in the spreadsheet.
+        Build the get_sheet_data result for an existing sheet.
+        
+        Args:
+            sheet_name: Name of the sheet
         
         Returns:
-            List[str]: List of sheet names
+            dict: Dictionary with the sheet name and its cells keyed by cell reference
+        """
+        # Get all cells for the given sheet from the map built at load time
+        cells_map = self._cells_by_sheet.get(sheet_name, {})
+        sheet_cells = {
+            cell_reference: {field: getattr(cell, field) for field in SHEET_CELL_FIELDS}
+            for cell_reference, cell in cells_map.items()
+        }
+        
+        return {
+            'name': sheet_name,
+            'cells': sheet_cells
+        }
+    
+    def _index_cells_by_sheet(self) -> Dict[str, Dict[str, Cell]]:
+        """
+        Group the loaded spreadsheet's cells by sheet name in a single pass.
+        
+        Returns:
+            dict: Mapping of sheet name to a dictionary of cells keyed by cell reference
+        """
+        cells_by_sheet = {}
+        for cell in self.spreadsheet.cells:
+            cells_by_sheet.setdefault(cell.sheet_name, {})[f"{cell.column}{cell.row}"] = cell
+        return cells_by_sheet
+    
+    @cached_property
+    def sheet_names(self) -> Tuple[str, ...]:
+        """
+        Sheet names of the loaded spreadsheet, computed once per load.
+        
+        Raises:
+            AttributeError: If no spreadsheet is loaded
         """
         if not self.spreadsheet:
-            logger.error("No spreadsheet loaded. Call load_spreadsheet() first.")
-            return []
-        return self.spreadsheet.sheet_names
+            raise AttributeError("No spreadsheet loaded. Call load_spreadsheet() first.")
+        return tuple(self.spreadsheet.sheet_names)
+    
+    @cached_property
+    def active_sheet(self) -> str:
+        """
+        Name of the active sheet of the loaded spreadsheet, computed once per load.
+        
+        Raises:
+            AttributeError: If no spreadsheet is loaded
+        """
+        if not self.spreadsheet:
+            raise AttributeError("No spreadsheet loaded. Call load_spreadsheet() first.")
+        return self.spreadsheet.active_sheet
+    
+    def get_sheet_names(self) -> Tuple[str, ...]:
+        """
+        Get the sheet names in the spreadsheet.
+        
+        Returns:
+            Tuple[str, ...]: Sheet names, empty if no spreadsheet is loaded
+        """
+        try:
+            return self.sheet_names
+        except AttributeError as e:
+            logger.error("%s", e)
+            return ()
     
     def get_active_sheet(self) -> str:
         """
@@ -342,10 +554,11 @@ class ExcelDatabase:
         Returns:
             str: Name of the active sheet
         """
-        if not self.spreadsheet:
-            logger.error("No spreadsheet loaded. Call load_spreadsheet() first.")
+        try:
+            return self.active_sheet
+        except AttributeError as e:
+            logger.error("%s", e)
             return ""
-        return self.spreadsheet.active_sheet
     
     def __enter__(self):
         """Context manager entry."""
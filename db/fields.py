@@ -0,0 +1,61 @@
+"""
+Custom MongoEngine fields for the database package.
+"""
+
+from typing import Any, Callable, Optional
+
+import bson
+from bson import Binary
+from mongoengine.base import BaseField
+
+# Key under which a packed value is wrapped, since a BSON document must be a mapping
+_PACKED_KEY = "v"
+
+
+class _PackedBytes(bytes):
+    """Marks BSON bytes loaded from the database that have not been decoded yet."""
+
+
+class PackedField(BaseField):
+    """
+    Field storing an arbitrary BSON-encodable value as a single binary blob.
+
+    Loading a document keeps the raw bytes, so MongoEngine does not walk and
+    convert every nested key as it does for DictField and ListField. The value
+    is decoded on first attribute access and the result is kept on the instance;
+    documents that are written back without being read are not re-encoded.
+
+    Documents stored before the field was packed hold the plain value, which is
+    returned as is. Values that cannot be encoded raise a ValidationError from
+    to_mongo, so each value is encoded only once per write.
+
+    Args:
+        default: Default value or callable, as for any MongoEngine field.
+    """
+
+    def __init__(self, default: Optional[Callable[[], Any]] = None, **kwargs):
+        super().__init__(default=default, **kwargs)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance._data.get(self.name)
+        if isinstance(value, _PackedBytes):
+            # Decode once and cache the result without marking the field as changed
+            value = bson.decode(value)[_PACKED_KEY]
+            instance._data[self.name] = value
+        return value
+
+    def to_python(self, value: Any) -> Any:
+        if isinstance(value, bytes) and not isinstance(value, _PackedBytes):
+            return _PackedBytes(value)
+        return value
+
+    def to_mongo(self, value: Any) -> Any:
+        if isinstance(value, _PackedBytes):
+            return Binary(value)
+        # The value is only encoded here, so validation errors are raised here too
+        try:
+            return Binary(bson.encode({_PACKED_KEY: value}))
+        except Exception as e:
+            self.error(f"Value cannot be packed as BSON: {e}")
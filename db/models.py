@@ -4,114 +4,55 @@ Database models for the Excel to Python LLM agent project.
 This module defines the MongoDB document models using MongoEngine ODM.
 """
 
+import time
+import logging
+from itertools import compress
 from datetime import datetime, UTC
 from typing import Dict, Any, List, Optional
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne, DeleteMany
 from mongoengine import (
     Document, 
-    EmbeddedDocument,
     StringField,
     IntField,
     DateTimeField,
     DictField,
     ListField,
-    EmbeddedDocumentListField,
-    BooleanField
+    ReferenceField,
+    BooleanField,
+    CASCADE
 )
 
+from .background import enqueue_bulk_write, flush_writes
+from .fields import PackedField
 
-class Cell(EmbeddedDocument):
+logger = logging.getLogger(__name__)
+
+# Number of cells sent to MongoDB per bulk write
+CELL_BATCH_SIZE = 1000
+
+# Timestamps taken within this window share a single datetime object
+_NOW_RESOLUTION_NS = 1_000_000
+
+# (monotonic tick, timestamp) of the last clock read made by utc_now()
+_now_cache = (0, None)
+
+
+def utc_now() -> datetime:
     """
-    Embedded document representing a cell in a spreadsheet.
+    Return the current UTC time, reusing the previous value within a 1ms window.
     
-    Attributes:
-        row: The row index of the cell (0-indexed).
-        column: The column index of the cell (0-indexed).
-        cell_reference: The Excel-style cell reference (e.g., "A1", "B2", "AA10").
-        value: The raw value of the cell.
-        formatted_value: The formatted display value of the cell.
-        alias: User-defined name/alias for the cell.
-        value_list: List of values when cell contains multiple values.
-        formula: The formula in the cell, if any.
-        formula_inputs: List of cell references that are inputs to this cell's formula.
-        sheet_name: The name of the sheet this cell belongs to.
-        data_type: The data type of the cell (string, number, date, etc.).
-        cell_type: The type of cell (value, list, formula, etc.).
-        precedent_cells: List of dictionaries containing cell references, sheet names, and workbook names that this cell depends on.
-        dependent_cells: List of dictionaries containing cell references, sheet names, and workbook names that depend on this cell.
-        metadata: Additional metadata for the cell.
-        created_at: When the cell was first created.
-        updated_at: When the cell value was last updated.
-        accessed_at: When the cell was last accessed by the LLM agent.
+    Building thousands of cells calls the timestamp defaults several times per cell;
+    this avoids a wall-clock read and a datetime allocation for each of them.
     """
-    row = IntField(required=True)
-    column = IntField(required=True)
-    cell_reference = StringField(required=True)
-    value = DictField(default={})  # Flexible field to store different types
-    formatted_value = StringField()
-    alias = StringField()  # User-defined name/alias for the cell
-    value_list = ListField(default=[])  # List of values when cell contains multiple values
-    formula = StringField()
-    formula_inputs = ListField(StringField(), default=[])  # List of cell references that are inputs to this cell's formula
-    sheet_name = StringField(required=True)  # Name of the sheet this cell belongs to
-    data_type = StringField()
-    cell_type = StringField(choices=["value", "valuelist", "formula"])  # Type of cell content
-    precedent_cells = ListField(DictField(), default=[])  # List of dicts with cell_ref, sheet_name, workbook_name
-    dependent_cells = ListField(DictField(), default=[])  # List of dicts with cell_ref, sheet_name, workbook_name
-    metadata = DictField(default={})
-    created_at = DateTimeField(default=lambda: datetime.now(UTC))
-    updated_at = DateTimeField(default=lambda: datetime.now(UTC))
-    accessed_at = DateTimeField(default=lambda: datetime.now(UTC))
-    
-    def __str__(self) -> str:
-        return f"{self.sheet_name}!{self.cell_reference}: {self.formatted_value or self.value}"
-        
-    def update_access_time(self):
-        """Update the accessed_at timestamp to the current time."""
-        self.accessed_at = datetime.now(UTC)
-        
-    def update_value(self, new_value):
-        """
-        Update the cell value and update the updated_at timestamp.
-        
-        Args:
-            new_value: The new value to set for the cell.
-        """
-        self.value = new_value
-        self.updated_at = datetime.now(UTC)
-        
-    def add_precedent(self, cell_ref, sheet_name=None, workbook_name=None):
-        """
-        Add a precedent cell to this cell's precedent list.
-        
-        Args:
-            cell_ref: The cell reference (e.g., "A1", "B2").
-            sheet_name: The name of the sheet containing the precedent cell.
-            workbook_name: The name of the workbook containing the precedent cell.
-        """
-        precedent = {
-            "cell_ref": cell_ref,
-            "sheet_name": sheet_name,
-            "workbook_name": workbook_name
-        }
-        if precedent not in self.precedent_cells:
-            self.precedent_cells.append(precedent)
-            
-    def add_dependent(self, cell_ref, sheet_name=None, workbook_name=None):
-        """
-        Add a dependent cell to this cell's dependent list.
-        
-        Args:
-            cell_ref: The cell reference (e.g., "A1", "B2").
-            sheet_name: The name of the sheet containing the dependent cell.
-            workbook_name: The name of the workbook containing the dependent cell.
-        """
-        dependent = {
-            "cell_ref": cell_ref,
-            "sheet_name": sheet_name,
-            "workbook_name": workbook_name
-        }
-        if dependent not in self.dependent_cells:
-            self.dependent_cells.append(dependent)
+    global _now_cache
+    tick = time.monotonic_ns()
+    cached_tick, cached_now = _now_cache
+    if cached_now is None or tick - cached_tick >= _NOW_RESOLUTION_NS:
+        cached_now = datetime.now(UTC)
+        _now_cache = (tick, cached_now)
+    return cached_now
+
 
 class Spreadsheet(Document):
     """
@@ -123,7 +64,7 @@ class Spreadsheet(Document):
         file_path: Path to the stored file, if applicable.
         sheet_names: List of sheet names in the spreadsheet.
         active_sheet: The name of the active sheet.
-        cells: List of Cell embedded documents.
+        cells: List of Cell documents, loaded from the cells collection on first access.
         metadata: Additional metadata for the spreadsheet.
         created_at: When the document was created.
         updated_at: When the document was last updated.
@@ -133,80 +74,509 @@ class Spreadsheet(Document):
     file_path = StringField()
     sheet_names = ListField(StringField())
     active_sheet = StringField()
-    cells = EmbeddedDocumentListField(Cell)
     metadata = DictField(default={})
-    created_at = DateTimeField(default=lambda: datetime.now(UTC))
-    updated_at = DateTimeField(default=lambda: datetime.now(UTC))
+    created_at = DateTimeField(default=utc_now)
+    updated_at = DateTimeField(default=utc_now)
     
     meta = {
         'collection': 'spreadsheets',
+        # Tolerate documents written before cells moved to their own collection
+        'strict': False,
         'indexes': [
-            'name',
+            # name and original_filename are queried together; the compound
+            # index also serves name-only queries through its prefix
+            ('name', 'original_filename'),
             'original_filename',
             'created_at'
         ]
     }
     
+    # In-memory list of cells, loaded lazily from the cells collection
+    _cells = None
+    
+    # In-memory lookup indexes mapping keys to positions in ``cells``, built lazily on first access
+    _cell_index_by_ref = None
+    _cell_index_by_rc = None
+    
+    # Casefolded sheet name to the workbook's sheet name, built with the indexes
+    _sheet_name_map = None
+    
+    # Whether every cell has a sheet_name, computed with the indexes; the
+    # sheet-agnostic fallback in get_cell_by_reference is only needed if not
+    _all_have_sheet_name = False
+    
+    # One flag per position in ``cells``, set for cells looked up since the last flush_access_times()
+    _accessed_flags = None
+    
+    @property
+    def cells(self) -> List['Cell']:
+        """The spreadsheet's cells, loaded from the cells collection on first access."""
+        if self._cells is None:
+            if self._data.get('cells'):
+                logger.warning(
+                    "Spreadsheet %s still embeds %d cells from before cells moved to their "
+                    "own collection; they are not loaded until migrate_embedded_cells() "
+                    "(or parsers.excel_parser.fix_missing_sheet_names) is run",
+                    self.name, len(self._data['cells'])
+                )
+            self._cells = list(Cell.objects(spreadsheet=self)) if self.pk else []
+        return self._cells
+    
+    @cells.setter
+    def cells(self, cells: List['Cell']) -> None:
+        self._cells = list(cells)
+        self._accessed_flags = None
+        self._invalidate_cell_index()
+    
+    def cell_count(self) -> int:
+        """
+        Return the number of cells without loading them.
+        
+        Uses the in-memory list when it is already loaded, and a server-side
+        count on the cells collection otherwise.
+        """
+        if self._cells is not None:
+            return len(self._cells)
+        if not self.pk:
+            return 0
+        return Cell.objects(spreadsheet=self).count()
+    
     def save(self, *args, **kwargs):
         """Override save method to update the updated_at field."""
-        self.updated_at = datetime.now(UTC)
+        self.updated_at = utc_now()
+        self._invalidate_cell_index()
         return super(Spreadsheet, self).save(*args, **kwargs)
     
-    def get_cell(self, row: int, column: int, sheet_name: str = None) -> Optional[Cell]:
+    def migrate_embedded_cells(self) -> int:
+        """
+        Move cells embedded in this spreadsheet's document into the cells collection.
+        
+        Spreadsheets stored before cells had their own collection keep them in a
+        ``cells`` array, which the model no longer maps. The array is copied into
+        the cells collection and then removed from the document. Cells without a
+        sheet_name get the one from their metadata, or else the active sheet, so
+        they fit the (spreadsheet, sheet_name, cell_reference) index. If the
+        collection already holds cells for this spreadsheet they were written
+        after the embedded ones, so the array is only removed.
+        
+        Returns:
+            The number of cells copied into the cells collection.
+        """
+        raw = Spreadsheet.objects(pk=self.pk).as_pymongo().first() if self.pk else None
+        if not raw or 'cells' not in raw:
+            return 0
+        
+        migrated = 0
+        if raw['cells'] and not Cell.objects(spreadsheet=self).count():
+            default_sheet = self.active_sheet or (self.sheet_names[0] if self.sheet_names else None)
+            cells = []
+            for doc in raw['cells']:
+                fields = {name: value for name, value in doc.items()
+                          if name in Cell._fields and name not in ('id', 'spreadsheet')}
+                if not fields.get('sheet_name'):
+                    fields['sheet_name'] = (fields.get('metadata') or {}).get('sheet_name') or default_sheet
+                cells.append(Cell(spreadsheet=self, **fields))
+            self.cells = cells
+            migrated = self.save_cells()
+        
+        self._get_collection().update_one({'_id': self.pk}, {'$unset': {'cells': ''}})
+        self._data.pop('cells', None)
+        logger.info("Migrated %d embedded cells of spreadsheet %s", migrated, self.name)
+        return migrated
+    
+    def save_cells(self, batch_size: int = CELL_BATCH_SIZE, background: bool = False) -> int:
+        """
+        Replace the persisted cells of this spreadsheet with the in-memory cells.
+        
+        Cells are written with unordered bulk inserts of ``batch_size`` documents,
+        so a workbook costs a handful of round trips instead of one write per cell.
+        The spreadsheet itself must have been saved first.
+        
+        Args:
+            batch_size: Number of cells per bulk write.
+            background: If True, queue the writes for the background writer thread
+                and return immediately. Call ``db.background.flush_writes()`` before
+                reading the cells back from the database; it raises the first
+                error of the queued writes.
+            
+        Returns:
+            The number of cells written.
+        """
+        self._write_cells([DeleteMany({'spreadsheet': self.pk})], background, ordered=True)
+        
+        batch = []
+        for cell in self.cells:
+            cell.spreadsheet = self
+            if cell.pk is None:
+                cell.pk = ObjectId()
+            batch.append(InsertOne(cell.to_mongo().to_dict()))
+            cell._clear_dependency_keys()
+            if len(batch) >= batch_size:
+                self._write_cells(batch, background)
+                batch = []
+        if batch:
+            self._write_cells(batch, background)
+        return len(self.cells)
+    
+    def upsert_cells(self, since: datetime, batch_size: int = CELL_BATCH_SIZE,
+                     background: bool = False) -> int:
+        """
+        Update the persisted cells of this spreadsheet in place from the in-memory cells.
+        
+        Each cell is upserted by (spreadsheet, sheet_name, cell_reference), so
+        reparsing a workbook rewrites existing cell documents instead of deleting
+        and re-inserting all of them. Persisted cells whose updated_at is older
+        than ``since`` no longer exist in the workbook and are removed afterwards.
+        
+        Args:
+            since: Start of the current parse; every in-memory cell must have an
+                updated_at at or after this time.
+            batch_size: Number of cells per bulk write.
+            background: If True, queue the writes for the background writer thread
+                and return immediately.
+            
+        Returns:
+            The number of cells written.
+        """
+        # Reuse the ids of the cells that are already stored, so in-memory cells
+        # keep matching their documents (e.g. for flush_access_times)
+        flush_writes()
+        existing_ids = {
+            (doc.get('sheet_name'), doc['cell_reference']): doc['_id']
+            for doc in Cell._get_collection().find(
+                {'spreadsheet': self.pk}, {'sheet_name': 1, 'cell_reference': 1}
+            )
+        }
+        
+        batch = []
+        for cell in self.cells:
+            cell.spreadsheet = self
+            cell.pk = existing_ids.get((cell.sheet_name, cell.cell_reference)) or cell.pk or ObjectId()
+            doc = cell.to_mongo().to_dict()
+            doc.pop('_id')
+            batch.append(UpdateOne(
+                {'spreadsheet': self.pk, 'sheet_name': cell.sheet_name, 'cell_reference': cell.cell_reference},
+                {'$set': doc, '$setOnInsert': {'_id': cell.pk}},
+                upsert=True
+            ))
+            cell._clear_dependency_keys()
+            if len(batch) >= batch_size:
+                self._write_cells(batch, background)
+                batch = []
+        if batch:
+            self._write_cells(batch, background)
+        
+        # MongoDB stores milliseconds, so compare against the truncated start time
+        # to keep cells stamped with exactly ``since``
+        since = since.replace(microsecond=since.microsecond // 1000 * 1000)
+        self._write_cells(
+            [DeleteMany({'spreadsheet': self.pk, 'updated_at': {'$lt': since}})], background, ordered=True
+        )
+        return len(self.cells)
+    
+    def _write_cells(self, operations: List[Any], background: bool, ordered: bool = False) -> None:
+        """Execute a bulk write on the cells collection, optionally through the background writer."""
+        collection = Cell._get_collection()
+        if background:
+            enqueue_bulk_write(collection, operations, ordered=ordered)
+        else:
+            collection.bulk_write(operations, ordered=ordered, bypass_document_validation=True)
+    
+    def _build_cell_index(self) -> None:
+        """Build the (sheet, reference) and (sheet, row, column) lookup indexes in a single pass."""
+        by_ref = {}
+        by_rc = {}
+        sheet_name_map = {name.casefold(): name for name in self.sheet_names or []}
+        all_have_sheet_name = True
+        for i, cell in enumerate(self.cells):
+            if not cell.sheet_name:
+                all_have_sheet_name = False
+            # Handle case where sheet_name might be None in the cell
+            cell_sheet = cell.sheet_name or self.active_sheet
+            by_ref.setdefault((cell_sheet, cell.cell_reference), i)
+            by_rc.setdefault((cell_sheet, cell.row, cell.column), i)
+            if cell_sheet:
+                sheet_name_map.setdefault(cell_sheet.casefold(), cell_sheet)
+        self._cell_index_by_ref = by_ref
+        self._cell_index_by_rc = by_rc
+        self._sheet_name_map = sheet_name_map
+        self._all_have_sheet_name = all_have_sheet_name
+    
+    def _invalidate_cell_index(self) -> None:
+        """Drop the lookup indexes so they are rebuilt on the next cell access."""
+        self._cell_index_by_ref = None
+        self._cell_index_by_rc = None
+        self._sheet_name_map = None
+    
+    def resolve_sheet_name(self, sheet_name: Optional[str]) -> Optional[str]:
+        """
+        Map a sheet name as written in a formula to the workbook's sheet name.
+        
+        Formula parsing changes the case of sheet names (the formulas library
+        upper-cases them) and keeps the quotes around names with spaces, so
+        names are matched case-insensitively and without quotes.
+        
+        Args:
+            sheet_name: The sheet name, as parsed from a formula.
+            
+        Returns:
+            The sheet name used by the spreadsheet's cells, or ``sheet_name``
+            unchanged if no sheet matches.
+        """
+        if not sheet_name:
+            return sheet_name
+        if self._cell_index_by_ref is None:
+            self._build_cell_index()
+        
+        unquoted = sheet_name
+        if len(unquoted) > 1 and unquoted[0] == unquoted[-1] == "'":
+            unquoted = unquoted[1:-1].replace("''", "'")
+        return self._sheet_name_map.get(unquoted.casefold(), sheet_name)
+    
+    def _mark_accessed(self, index: int) -> None:
+        """Record a lookup of the cell at ``index``; the timestamp is written by flush_access_times()."""
+        if self._accessed_flags is None:
+            self._accessed_flags = bytearray(len(self.cells))
+        elif index >= len(self._accessed_flags):
+            # Cells may have been appended since the flags were allocated
+            self._accessed_flags.extend(bytes(len(self.cells) - len(self._accessed_flags)))
+        self._accessed_flags[index] = 1
+    
+    def flush_access_times(self) -> int:
+        """
+        Set accessed_at on every cell looked up since the last flush.
+        
+        All accessed cells get the same timestamp, written with a single
+        update_many instead of one update per lookup.
+        
+        Returns:
+            The number of cells updated.
+        """
+        if self._accessed_flags is None:
+            return 0
+        
+        now = utc_now()
+        cell_ids = []
+        for cell in compress(self.cells, self._accessed_flags):
+            cell.accessed_at = now
+            if cell.pk is not None:
+                cell_ids.append(cell.pk)
+        count = self._accessed_flags.count(1)
+        self._accessed_flags = None
+        
+        if cell_ids:
+            # The cells may still be queued for insertion by the background writer
+            flush_writes()
+            Cell._get_collection().update_many(
+                {'_id': {'$in': cell_ids}},
+                {'$set': {'accessed_at': now}}
+            )
+        return count
+    
+    def get_cell(self, row: int, column: int, sheet_name: str = None) -> Optional['Cell']:
         """
         Get a cell by its row and column indices.
         
         Args:
             row: The row index.
             column: The column index.
-            sheet_name: The name of the sheet (defaults to active_sheet if None).
+            sheet_name: The name of the sheet (defaults to active_sheet if None),
+                matched case-insensitively.
             
         Returns:
             The Cell object if found, None otherwise.
         """
         if sheet_name is None:
             sheet_name = self.active_sheet
+        
+        if self._cell_index_by_ref is None:
+            self._build_cell_index()
+        sheet_name = self.resolve_sheet_name(sheet_name)
             
-        for cell in self.cells:
-            if cell.row == row and cell.column == column and cell.sheet_name == sheet_name:
-                cell.update_access_time()
-                return cell
-        return None
+        index = self._cell_index_by_rc.get((sheet_name, row, column))
+        if index is None:
+            return None
+        self._mark_accessed(index)
+        return self.cells[index]
     
-    def get_cell_by_reference(self, cell_reference: str, sheet_name: str = None) -> Optional[Cell]:
+    def get_cell_by_reference(self, cell_reference: str, sheet_name: str = None) -> Optional['Cell']:
         """
         Get a cell by its Excel-style reference (e.g., "A1", "B2").
         
         Args:
             cell_reference: The Excel-style cell reference.
-            sheet_name: The name of the sheet (defaults to active_sheet if None).
+            sheet_name: The name of the sheet (defaults to active_sheet if None),
+                matched case-insensitively.
             
         Returns:
             The Cell object if found, None otherwise.
         """
         if sheet_name is None:
             sheet_name = self.active_sheet
+        
+        if self._cell_index_by_ref is None:
+            self._build_cell_index()
+        sheet_name = self.resolve_sheet_name(sheet_name)
             
         # First try to find an exact match
-        for cell in self.cells:
-            # Handle case where sheet_name might be None in the cell
-            cell_sheet = cell.sheet_name or self.active_sheet
-            
-            if cell.cell_reference == cell_reference and cell_sheet == sheet_name:
-                cell.update_access_time()
-                return cell
+        index = self._cell_index_by_ref.get((sheet_name, cell_reference))
+        if index is not None:
+            self._mark_accessed(index)
+            return self.cells[index]
+        
+        if self._all_have_sheet_name:
+            return None
                 
         # If no exact match is found, try again ignoring sheet_name
         # This is a fallback for older data where sheet_name might not have been set
-        for cell in self.cells:
+        for index, cell in enumerate(self.cells):
             if cell.cell_reference == cell_reference:
                 # If we find a match, update the sheet_name to be correct going forward
                 if not cell.sheet_name:
                     cell.sheet_name = sheet_name
-                cell.update_access_time()
+                    self._invalidate_cell_index()
+                self._mark_accessed(index)
                 return cell
                 
         return None
     
     def __str__(self) -> str:
-        return f"Spreadsheet: {self.name} ({len(self.cells)} cells)" 
\ No newline at end of file
+        return f"Spreadsheet: {self.name} ({self.cell_count()} cells)"
+
+class Cell(Document):
+    """
+    Document representing a cell in a spreadsheet.
+    
+    Cells are stored in their own collection and reference their parent
+    spreadsheet, so large workbooks are not bound by the document size limit.
+    The value, value_list, dependency lists and metadata are stored as packed
+    BSON blobs and only decoded when they are read.
+    
+    Attributes:
+        spreadsheet: The Spreadsheet this cell belongs to.
+        row: The row index of the cell (0-indexed).
+        column: The column index of the cell (0-indexed).
+        cell_reference: The Excel-style cell reference (e.g., "A1", "B2", "AA10").
+        value: The raw value of the cell.
+        formatted_value: The formatted display value of the cell.
+        alias: User-defined name/alias for the cell.
+        value_list: List of (workbook_name, sheet_name, cell_ref) options when the cell has list validation.
+        formula: The formula in the cell, if any.
+        formula_inputs: List of cell references that are inputs to this cell's formula.
+        sheet_name: The name of the sheet this cell belongs to.
+        data_type: The data type of the cell (string, number, date, etc.).
+        cell_type: The type of cell (value, list, formula, etc.).
+        precedent_cells: List of dictionaries containing cell references, sheet names, and workbook names that this cell depends on.
+        dependent_cells: List of dictionaries containing cell references, sheet names, and workbook names that depend on this cell.
+        metadata: Additional metadata for the cell.
+        created_at: When the cell was first created.
+        updated_at: When the cell value was last updated.
+        accessed_at: When the cell was last accessed by the LLM agent.
+    """
+    spreadsheet = ReferenceField(Spreadsheet, reverse_delete_rule=CASCADE)
+    row = IntField(required=True)
+    column = IntField(required=True)
+    cell_reference = StringField(required=True)
+    value = PackedField(default=dict)  # Flexible field to store different types, packed as BSON
+    formatted_value = StringField()
+    alias = StringField()  # User-defined name/alias for the cell
+    value_list = PackedField(default=list)  # List of (workbook_name, sheet_name, cell_ref) options
+    formula = StringField()
+    formula_inputs = ListField(StringField(), default=[])  # List of cell references that are inputs to this cell's formula
+    sheet_name = StringField(required=True)  # Name of the sheet this cell belongs to
+    data_type = StringField()
+    cell_type = StringField(choices=["value", "valuelist", "formula"])  # Type of cell content
+    precedent_cells = PackedField(default=list)  # List of dicts with cell_ref, sheet_name, workbook_name
+    dependent_cells = PackedField(default=list)  # List of dicts with cell_ref, sheet_name, workbook_name
+    metadata = PackedField(default=dict)
+    created_at = DateTimeField(default=utc_now)
+    updated_at = DateTimeField(default=utc_now)
+    accessed_at = DateTimeField(default=utc_now)
+    
+    meta = {
+        'collection': 'cells',
+        'indexes': [
+            {'fields': ['spreadsheet', 'sheet_name', 'cell_reference'], 'unique': True},
+            {'fields': ['spreadsheet', 'sheet_name', 'row', 'column']}
+        ]
+    }
+    
+    def __str__(self) -> str:
+        return f"{self.sheet_name}!{self.cell_reference}: {self.formatted_value or self.value}"
+        
+    def update_access_time(self):
+        """Update the accessed_at timestamp to the current time."""
+        self.accessed_at = utc_now()
+        
+    def update_value(self, new_value):
+        """
+        Update the cell value and update the updated_at timestamp.
+        
+        Args:
+            new_value: The new value to set for the cell.
+        """
+        self.value = new_value
+        self.updated_at = utc_now()
+        
+    # Hash sets mirroring precedent_cells / dependent_cells for O(1) duplicate checks,
+    # built lazily from the lists and dropped once the cell has been persisted
+    _precedent_keys = None
+    _dependent_keys = None
+    
+    def clear_dependencies(self):
+        """Remove all precedents, dependents and formula inputs from this cell."""
+        self.precedent_cells = []
+        self.dependent_cells = []
+        self.formula_inputs = []
+        self._clear_dependency_keys()
+        
+    def _clear_dependency_keys(self):
+        """Drop the precedent/dependent membership sets; they are rebuilt on demand."""
+        self._precedent_keys = None
+        self._dependent_keys = None
+        
+    def add_precedent(self, cell_ref, sheet_name=None, workbook_name=None):
+        """
+        Add a precedent cell to this cell's precedent list.
+        
+        Args:
+            cell_ref: The cell reference (e.g., "A1", "B2").
+            sheet_name: The name of the sheet containing the precedent cell.
+            workbook_name: The name of the workbook containing the precedent cell.
+        """
+        if self._precedent_keys is None:
+            self._precedent_keys = {
+                (p["cell_ref"], p["sheet_name"], p["workbook_name"]) for p in self.precedent_cells
+            }
+        key = (cell_ref, sheet_name, workbook_name)
+        if key in self._precedent_keys:
+            return
+        self.precedent_cells.append({
+            "cell_ref": cell_ref,
+            "sheet_name": sheet_name,
+            "workbook_name": workbook_name
+        })
+        self._precedent_keys.add(key)
+            
+    def add_dependent(self, cell_ref, sheet_name=None, workbook_name=None):
+        """
+        Add a dependent cell to this cell's dependent list.
+        
+        Args:
+            cell_ref: The cell reference (e.g., "A1", "B2").
+            sheet_name: The name of the sheet containing the dependent cell.
+            workbook_name: The name of the workbook containing the dependent cell.
+        """
+        if self._dependent_keys is None:
+            self._dependent_keys = {
+                (d["cell_ref"], d["sheet_name"], d["workbook_name"]) for d in self.dependent_cells
+            }
+        key = (cell_ref, sheet_name, workbook_name)
+        if key in self._dependent_keys:
+            return
+        self.dependent_cells.append({
+            "cell_ref": cell_ref,
+            "sheet_name": sheet_name,
+            "workbook_name": workbook_name
+        })
+        self._dependent_keys.add(key)
\ No newline at end of file
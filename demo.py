@@ -60,6 +60,8 @@ async def main(spreadsheet_path: Path) -> None:
     graph_save_path = (
         Path(variable_agent.project_dir) / f"computegraph_{spreadsheet_name}.png"
     ).as_posix()
+    # pyplot is not thread-safe and GUI backends only work on the main thread,
+    # so the graph is rendered here rather than alongside the LLM calls
     variable_agent.graph.visualize(
         figsize=(8, 12),
         node_size=1200,
@@ -0,0 +1,25 @@
+# cython: language_level=3
+"""
+beam_design/_kernel.pyx
+-----------------------
+Optional compiled kernel for batch beam demand calculations.
+"""
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def demands_batch(double[::1] P, double[::1] L, double[::1] q, double[::1] t,
+                  double[::1] M, double[::1] V):
+    """
+    Fill M (kip-ft) and V (kips) with the midspan moment and support shear of each beam.
+    
+    All arrays must be contiguous float64 arrays of the same length.
+    """
+    cdef Py_ssize_t i, n = P.shape[0]
+    cdef double PL, qt
+    for i in range(n):
+        PL = P[i] * L[i]
+        qt = q[i] * t[i]
+        M[i] = 0.25 * PL + 0.000125 * qt * L[i] * L[i]
+        V[i] = 0.5 * PL + 0.0005 * qt * L[i]
@@ -2,35 +2,162 @@
 beam_design/calculations.py
 ---------------------------
 Contains core calculation functions for beam design checks.
+
+The load inputs may be scalars or NumPy arrays; array inputs are broadcast
+against each other so a whole design sweep is evaluated in one call.
 """
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    # Compiled Cython kernel, see README.md for the build command
+    from _kernel import demands_batch as _demands_batch
+except ImportError:
+    _demands_batch = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; batches fall back to NumPy broadcasting
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _beam_kernel(P, L, q, t, out_M, out_V):
+        """Fused moment/shear loop over flat float64 arrays, compiled by numba."""
+        for i in prange(P.size):
+            qt = q[i] * t[i]
+            out_M[i] = 0.25 * P[i] * L[i] + 0.000125 * qt * L[i] * L[i]
+            out_V[i] = 0.5 * P[i] * L[i] + 0.0005 * qt * L[i]
+else:
+    _beam_kernel = None
+
+# Smallest batch (number of beams) evaluated with a compiled kernel; smaller batches
+# are as fast with NumPy broadcasting, and would pay numba's JIT compile on first use
+COMPILED_KERNEL_MIN_SIZE = 100_000
+
+def _as_result(value):
+    """Return 0-d results of scalar inputs as floats, and array results unchanged."""
+    return float(value) if np.ndim(value) == 0 else value
 
 def calculate_moment(P_kip, length_of_beam_ft, area_load_q, trib_width_ft):
     """
     Calculate the moment at mid span of the beam (kip-ft).
+    
+    Returns a float for scalar inputs and an array for array inputs.
     """
-    uniform_load_kip_ft = area_load_q * trib_width_ft / 1000  # psf * ft / 1000 = kip/ft
-    M = P_kip * length_of_beam_ft / 4 + uniform_load_kip_ft * length_of_beam_ft ** 2 / 8
-    return M
+    P_kip, length_of_beam_ft, area_load_q, trib_width_ft = map(
+        np.asarray, (P_kip, length_of_beam_ft, area_load_q, trib_width_ft)
+    )
+    # P*L/4 + (q*t/1000)*L^2/8 with the constants folded: 1/8000 = 0.000125
+    M = 0.25 * P_kip * length_of_beam_ft + 0.000125 * area_load_q * trib_width_ft * length_of_beam_ft * length_of_beam_ft
+    return _as_result(M)
 
 def calculate_shear(P_kip, length_of_beam_ft, area_load_q, trib_width_ft):
     """
     Calculate the shear force at the support (kips).
+    
+    Returns a float for scalar inputs and an array for array inputs.
     """
-    uniform_load_kip_ft = area_load_q * trib_width_ft / 1000
-    V = P_kip * length_of_beam_ft / 2 + uniform_load_kip_ft * length_of_beam_ft / 2
-    return V
+    P_kip, length_of_beam_ft, area_load_q, trib_width_ft = map(
+        np.asarray, (P_kip, length_of_beam_ft, area_load_q, trib_width_ft)
+    )
+    # P*L/2 + (q*t/1000)*L/2 with the constants folded: 1/2000 = 0.0005
+    V = 0.5 * P_kip * length_of_beam_ft + 0.0005 * area_load_q * trib_width_ft * length_of_beam_ft
+    return _as_result(V)
 
+def calculate_demands(P_kip, length_of_beam_ft, area_load_q, trib_width_ft):
+    """
+    Calculate midspan moment (kip-ft) and support shear (kips) in a single pass.
+    
+    The uniform load and the point load term are computed once and shared by
+    both results. Returns (M, V), as floats for scalar inputs.
+    """
+    P_kip, length_of_beam_ft, area_load_q, trib_width_ft = map(
+        np.asarray, (P_kip, length_of_beam_ft, area_load_q, trib_width_ft)
+    )
+    uniform_load_kip_ft = area_load_q * trib_width_ft * 1e-3  # psf * ft / 1000 = kip/ft
+    half_PL = P_kip * length_of_beam_ft * 0.5
+    M = half_PL * 0.5 + uniform_load_kip_ft * length_of_beam_ft * length_of_beam_ft * 0.125
+    V = half_PL + uniform_load_kip_ft * length_of_beam_ft * 0.5
+    return _as_result(M), _as_result(V)
+
+def calculate_beam_batch(P_kip, length_of_beam_ft, area_load_q, trib_width_ft):
+    """
+    Calculate midspan moment (kip-ft) and support shear (kips) for many beams at once.
+    
+    The inputs are broadcast against each other, e.g. arrays from np.meshgrid
+    for every combination of span and load. Returns (M, V) as float arrays
+    of the broadcast shape. Batches of at least COMPILED_KERNEL_MIN_SIZE beams use
+    the compiled Cython kernel when it has been built, otherwise a parallel numba
+    kernel when numba is installed.
+    """
+    P_kip, length_of_beam_ft, area_load_q, trib_width_ft = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (P_kip, length_of_beam_ft, area_load_q, trib_width_ft))
+    )
+    kernel = _demands_batch or _beam_kernel
+    if kernel is not None and P_kip.size >= COMPILED_KERNEL_MIN_SIZE:
+        # One compiled pass over the inputs computes both demands
+        shape = P_kip.shape
+        flat = [np.ascontiguousarray(x).ravel() for x in (P_kip, length_of_beam_ft, area_load_q, trib_width_ft)]
+        M = np.empty(flat[0].size)
+        V = np.empty(flat[0].size)
+        kernel(*flat, M, V)
+        return M.reshape(shape), V.reshape(shape)
+    M, V = calculate_demands(P_kip, length_of_beam_ft, area_load_q, trib_width_ft)
+    # Keep arrays even when every input is a scalar
+    return np.asarray(M), np.asarray(V)
+
+# Section database as parallel arrays indexed by section id, so capacities of
+# many candidate sections can be gathered and compared in one vectorized step
+# Capacities are stored as float32 (4 bytes per section) and section ids as int16,
+# which keeps large candidate tables compact in cache; int16 holds ids for up to
+# 32767 sections, enough for the full AISC shapes table
+SECTION_DTYPE = np.float32
+SECTION_ID_DTYPE = np.int16
+
+# Section type -> (moment capacity in kip-ft, shear capacity in kips)
+SECTION_DATABASE = {
+    'alpha': (20, 40),
+    'bravo': (50, 60),
+    'charlie': (100, 80),
+    'delta': (200, 150)
+}
+
+SECTION_NAMES = np.array(list(SECTION_DATABASE))
+SECTION_M = np.array([m for m, _ in SECTION_DATABASE.values()], dtype=SECTION_DTYPE)  # Moment capacity (kip-ft)
+SECTION_V = np.array([v for _, v in SECTION_DATABASE.values()], dtype=SECTION_DTYPE)  # Shear capacity (kips)
+SECTION_IDX = {name: i for i, name in enumerate(SECTION_DATABASE)}
+
+@lru_cache(maxsize=32)
 def get_section_properties(section_type):
     """
     Return moment and shear capacity for a given section type.
+    
+    Results are cached and shared between callers; do not modify them.
     """
-    section_database = {
-        'alpha': {'M': 20, 'V': 40},
-        'bravo': {'M': 50, 'V': 60},
-        'charlie': {'M': 100, 'V': 80},
-        'delta': {'M': 200, 'V': 150}
-    }
-    return section_database.get(section_type, None)
+    capacity = SECTION_DATABASE.get(section_type)
+    if capacity is None:
+        return None
+    return {'M': capacity[0], 'V': capacity[1]}
+
+def get_section_capacity(section_type):
+    """
+    Return (moment capacity, shear capacity) for a given section type.
+    """
+    return SECTION_DATABASE[section_type]
+
+def get_section_indices(section_types):
+    """
+    Convert a sequence of section type names to an int16 array of section ids.
+    """
+    return np.fromiter((SECTION_IDX[t] for t in section_types), dtype=SECTION_ID_DTYPE)
+
+def get_section_capacity_batch(idx_array):
+    """
+    Return (moment capacities, shear capacities) for an array of section ids.
+    """
+    return SECTION_M[idx_array], SECTION_V[idx_array]
 
 def check_load(P_kip, max_P):
     return "Load is too much!" if P_kip > max_P else "Load below limit"
@@ -49,3 +176,26 @@ def check_capacity(moment, shear, section_type):
         'moment_capacity_Mcap': props['M'],
         'shear_capacity_Vcap': props['V']
     }
+
+def check_capacity_vec(applied, capacity):
+    """
+    Return a boolean array that is True where the capacity covers the applied demand.
+    
+    Capacities may be stored as float32, but the comparison runs in float64 so
+    demands just above a capacity are not rounded down to it, matching check_capacity.
+    """
+    return np.asarray(capacity, dtype=float) >= np.asarray(applied, dtype=float)
+
+def design_status_vec(moment_ok, shear_ok):
+    """
+    Return a boolean array that is True where both the moment and shear checks pass.
+    """
+    return np.logical_and(moment_ok, shear_ok)
+
+def capacity_labels(ok):
+    """Convert capacity check results to 'OK'/'NG' labels for reporting."""
+    return np.where(ok, 'OK', 'NG')
+
+def design_labels(design_pass):
+    """Convert design check results to 'Pass'/'Fail' labels for reporting."""
+    return np.where(design_pass, 'Pass', 'Fail')
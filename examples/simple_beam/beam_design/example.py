@@ -3,7 +3,12 @@ beam_design/example.py
 ----------------------
 Example script to demonstrate beam design calculations.
 """
-from calculations import calculate_moment, calculate_shear, get_section_properties, check_load, check_capacity
+import numpy as np
+
+from calculations import (
+    calculate_demands, calculate_beam_batch, get_section_properties, check_load, check_capacity,
+    get_section_indices, get_section_capacity_batch, check_capacity_vec, design_status_vec, design_labels
+)
 
 def main():
     # Example input values
@@ -15,8 +20,7 @@ def main():
     max_P = 100
 
     # Calculations
-    moment = calculate_moment(P_kip, length_of_beam_ft, area_load_q, trib_width_ft)
-    shear = calculate_shear(P_kip, length_of_beam_ft, area_load_q, trib_width_ft)
+    moment, shear = calculate_demands(P_kip, length_of_beam_ft, area_load_q, trib_width_ft)
     load_message = check_load(P_kip, max_P)
     capacity_results = check_capacity(moment, shear, section_type)
 
@@ -36,5 +40,21 @@ def main():
     print(f"Shear Capacity Status: {capacity_results['shear_capacity_status']}")
     print(f"\nDesign Status: {capacity_results['design_status']}")
 
+    # Design sweep over every combination of beam length and point load
+    lengths_ft, loads_kip = np.meshgrid(np.linspace(10, 30, 5), np.linspace(5, 25, 5))
+    sweep_moments, sweep_shears = calculate_beam_batch(loads_kip, lengths_ft, area_load_q, trib_width_ft)
+    print(f"\nDesign Sweep ({sweep_moments.size} beams)\n{'='*30}")
+    print(f"Moment range: {sweep_moments.min():.2f} - {sweep_moments.max():.2f} kip-ft")
+    print(f"Shear range: {sweep_shears.min():.2f} - {sweep_shears.max():.2f} kip")
+
+    # Check every swept beam against the chosen section without a Python loop
+    section_M, section_V = get_section_capacity_batch(get_section_indices([section_type]))
+    sweep_pass = design_status_vec(
+        check_capacity_vec(sweep_moments, section_M),
+        check_capacity_vec(sweep_shears, section_V),
+    )
+    print(f"Passing designs for section '{section_type}': {int(sweep_pass.sum())} of {sweep_pass.size}")
+    print(f"Status grid (rows: point load, columns: length):\n{design_labels(sweep_pass)}")
+
 if __name__ == "__main__":
     main()
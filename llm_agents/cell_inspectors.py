@@ -1,5 +1,5 @@
 
-import os
+from pathlib import Path
 from langchain.tools.base import StructuredTool
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import ToolNode
@@ -9,14 +9,17 @@ from db.excel_manager import ExcelDatabase
 
 from utils.excel import get_excel_tile_data
 from utils.graph import ComputeGraph
+from utils.prompts import load_prompt
 
 from typing import List, Dict, Any, Tuple
 import asyncio
 from dotenv import load_dotenv
 import pickle
-import yaml
 from langfuse.callback import CallbackHandler
 
+# Maximum number of cells sent to the LLM at the same time
+MAX_CONCURRENT_CELLS = 16
+
 class ExcelVariableAgent:
     def __init__(self,
                  spread_sheet_path: str,
@@ -26,7 +29,7 @@ class ExcelVariableAgent:
                  ):
         
         self.load_db(spread_sheet_path)
-        self.project_dir = os.path.dirname(os.path.abspath(spread_sheet_path))
+        self.project_dir = str(Path(spread_sheet_path).resolve().parent)
 
         self.construct_system_prompt(system_prompt)
         self.openai_model = openai_model
@@ -38,15 +41,13 @@ class ExcelVariableAgent:
 
     def construct_system_prompt(self,custom_prompt:str|None=None):
         if custom_prompt is None:
-            with open("prompts/cell_inspector.yaml", "r") as f:
-                system_prompt = yaml.safe_load(f)
-            self.system_prompt = system_prompt["prompt"]
+            self.system_prompt = load_prompt("prompts/cell_inspector.yaml")
         else:
             self.system_prompt = custom_prompt
 
     def load_db(self,spread_sheet_path):
         """load processed mongo spreadsheet database"""
-        self.spreadsheet_name = spread_sheet_path.split("/")[-1].split(".")[0]
+        self.spreadsheet_name = Path(spread_sheet_path).stem
         self.db = ExcelDatabase(spread_sheet_path)
         self.db.reparse_spreadsheet(name=self.spreadsheet_name)
         self.db.load_spreadsheet()
@@ -102,7 +103,7 @@ class ExcelVariableAgent:
 
     async def call_model(self,state: MessagesState):
         messages = state["messages"]
-        response = self.model_with_tools.invoke(messages)
+        response = await self.model_with_tools.ainvoke(messages)
         return {"messages": [response]}
 
     def get_cell_tile_data(self,cell_id:str, sheetname:str) -> str:
@@ -158,10 +159,12 @@ class ExcelVariableAgent:
         """creates a description of formula cell and its dependent cells."""
         cell_data = self.db.get_cell_data(cell_id, sheetname)
         formula = cell_data.get('formula', '')
-        context = f"Cell {cell_id} in sheet '{sheetname}' contains the formula: {formula}. "
-        context += "Dependent cell information is as follows:\n"
-        # add a header 
-        context += "| Precedent Cell ID | Sheet Name | Variable Name | Variable Description | Python Code |\n"
+        parts = [
+            f"Cell {cell_id} in sheet '{sheetname}' contains the formula: {formula}. ",
+            "Dependent cell information is as follows:\n",
+            # add a header 
+            "| Precedent Cell ID | Sheet Name | Variable Name | Variable Description | Python Code |\n"
+        ]
         for d_cell in cell_data['precedent_cells']:
             precedent_cell_id = d_cell['cell_ref']
             precedent_sheetname = d_cell['sheet_name']
@@ -169,8 +172,8 @@ class ExcelVariableAgent:
             variable_name = self.variable_db[key]['variable_name'] 
             variable_desr = self.variable_db[key]['variable_desr']
             python_code = self.variable_db[key]['python_code']
-            context += f"| {precedent_cell_id} | {precedent_sheetname} | {variable_name} | {variable_desr} | {python_code} |\n"
-        return context
+            parts.append(f"| {precedent_cell_id} | {precedent_sheetname} | {variable_name} | {variable_desr} | {python_code} |\n")
+        return "".join(parts)
     
     def extract_value_cell_context(self, cell_id: str, sheetname: str) -> str:
         """creates a description of value cell and its dependent cells."""
@@ -182,15 +185,20 @@ class ExcelVariableAgent:
     def extract_valuelist_cell_context(self, cell_id: str, sheetname: str) -> str:
         """creates a description of valuelist cell and its dependent cells."""
         cell_data = self.db.get_cell_data(cell_id, sheetname)
-        context = f"Cell {cell_id} in sheet '{sheetname}' can have a finite set of input values defined as follows:"
-        # add header
-        context += "\n| Value |\n"
-        for cell in cell_data['value_list']:
-            cell_id = cell['cell_ref']
-            sheetname = cell['sheet_name']
+        parts = [
+            f"Cell {cell_id} in sheet '{sheetname}' can have a finite set of input values defined as follows:",
+            # add header
+            "\n| Value |\n"
+        ]
+        for option in cell_data['value_list']:
+            if isinstance(option, dict):
+                # Options stored before they were packed as tuples
+                cell_id, sheetname = option['cell_ref'], option['sheet_name']
+            else:
+                _, sheetname, cell_id = option
             value = self.db.get_cell_data(cell_id, sheetname)['value']['raw']
-            context += f"| {value} |\n"
-        return context
+            parts.append(f"| {value} |\n")
+        return "".join(parts)
                    
     async def ainvoke(self, cell_id,sheetname, thread_id="test"):
         config = {"configurable": {"thread_id": thread_id}}
@@ -210,23 +218,32 @@ class ExcelVariableAgent:
         messages = await self.app.ainvoke(user_inputs,config=config)
         return messages 
 
-    async def process_layer(self, layer) -> List[Any]:
+    async def orchestrate_variable_extraction(self,save_db:bool=True, max_concurrency:int=MAX_CONCURRENT_CELLS):
         """
-        Process a layer of cells by invoking ainvoke concurrently for each cell in the layer.
+        Process every cell as soon as all of its precedent cells are processed.
+        
+        Cells are not held back by a per-layer barrier; the number of concurrent
+        LLM calls is bounded by max_concurrency instead.
         """
-        tasks = [
-            self.ainvoke(cell_id, sheetname, f"{sheetname}!{cell_id}")
-            for sheetname, cell_id in layer
-        ]
-        return await asyncio.gather(*tasks)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        tasks = {}
+
+        async def process_cell(key, precedent_keys):
+            await asyncio.gather(*(tasks[precedent_key] for precedent_key in precedent_keys))
+            sheetname, cell_id = key
+            async with semaphore:
+                return await self.ainvoke(cell_id, sheetname, f"{sheetname}!{cell_id}")
 
-    async def orchestrate_variable_extraction(self,save_db:bool=True):
-        for i,layer in enumerate(self.layers):
-            print(f"processing layer {i} with {len(layer)} cells")
-            await self.process_layer(layer)
+        # Layers are in topological order, so the tasks of a cell's precedents always exist
+        print(f"processing {sum(map(len, self.layers))} cells in {len(self.layers)} layers")
+        for layer in self.layers:
+            for key in layer:
+                precedent_keys = list(self.graph.graph.predecessors(key))
+                tasks[key] = asyncio.create_task(process_cell(key, precedent_keys))
+        await asyncio.gather(*tasks.values())
         if save_db:
             with open(f"{self.project_dir}/variable_db_{self.spreadsheet_name}.pkl", "wb") as f:
-                pickle.dump(self.variable_db, f)
+                pickle.dump(self.variable_db, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     def load_variable_db(self,spreadsheet_name:str):
         with open(f"{self.project_dir}/variable_db_{spreadsheet_name}.pkl", "rb") as f:
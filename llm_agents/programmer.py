@@ -10,13 +10,14 @@ from tqdm import tqdm
 
 from utils.excel import get_excel_tile_data
 from utils.graph import ComputeGraph
+from utils.prompts import load_prompt
 
 from typing import List, Dict, Any, Tuple
 import asyncio
 from dotenv import load_dotenv
 import pickle
-import yaml
 import os
+from pathlib import Path
 import logging
 from langfuse.callback import CallbackHandler
 
@@ -28,10 +29,13 @@ class ProgrammerAgent:
                  trace_with_langfuse: bool = False
                  ):
         
-        self.spreadsheet_name = spread_sheet_path.split("/")[-1].split(".")[0]
-        self.project_dir = os.path.dirname(os.path.abspath(spread_sheet_path))
+        spreadsheet_path = Path(spread_sheet_path)
+        self.spreadsheet_name = spreadsheet_path.stem
+        self.project_dir_path = spreadsheet_path.resolve().parent
+        self.project_dir = str(self.project_dir_path)
         self.openai_model = openai_model
         self.trace_with_langfuse = trace_with_langfuse
+        self._coding_context = None  # (variable_db size, context) from the last build_coding_context call
 
         self.load_variable_db()
         self.construct_system_prompt(system_prompt)
@@ -41,15 +45,14 @@ class ProgrammerAgent:
 
     def construct_system_prompt(self,custom_prompt:str|None=None):
         if custom_prompt is None:
-            with open("prompts/programmer.yaml", "r") as f:
-                system_prompt = yaml.safe_load(f)
-            self.system_prompt = system_prompt["prompt"]
+            self.system_prompt = load_prompt("prompts/programmer.yaml")
         else:
             self.system_prompt = custom_prompt
 
     def load_variable_db(self):
         with open(f"{self.project_dir}/variable_db_{self.spreadsheet_name}.pkl", "rb") as f:
             self.variable_db = pickle.load(f)
+        self._coding_context = None
         return self.variable_db
         
     def build_tools(self):
@@ -100,9 +103,8 @@ class ProgrammerAgent:
         """
         This tool is used to write python code to a file at the specified path.
         """
-        absolute_save_path = os.path.join(self.project_dir, save_path)
-        with open(absolute_save_path, "w") as f:
-            f.write(python_code)
+        absolute_save_path = self.project_dir_path / save_path
+        self._write_file(absolute_save_path, python_code)
         logging.info(f"Created {absolute_save_path}")
         return f"Created {save_path}"
     
@@ -112,31 +114,47 @@ class ProgrammerAgent:
         """
         This tool is used to write readme content to a file at the specified path.
         """
-        absolute_save_path = os.path.join(self.project_dir, save_path)
-        with open(absolute_save_path, "w") as f:
-            f.write(readme_content)
+        absolute_save_path = self.project_dir_path / save_path
+        self._write_file(absolute_save_path, readme_content)
         logging.info(f"Created {absolute_save_path}")
         return f"Created {save_path}"
     
+    @staticmethod
+    def _write_file(path: Path, content: str) -> None:
+        """Write content to path as UTF-8 with a single unbuffered write."""
+        data = content.encode("utf-8")
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+    
     def create_directory(self, directory_path:str) -> None:
         """
         This tool is used to create a directory at the specified path.
         """
         # join the relative directory path with the project directory
-        save_directory_path = os.path.join(self.project_dir, directory_path)
+        save_directory_path = self.project_dir_path / directory_path
         os.makedirs(save_directory_path, exist_ok=True)
         logging.info(f"Created {save_directory_path}")
         return f"Created {directory_path}"
     
     def build_coding_context(self) -> str:
         """This method will collect the information inside the variable database from cell inspectors and 
-        returns a combined context for the programmer agent to organize them into a proper and consistent code."""
-        context = ""
+        returns a combined context for the programmer agent to organize them into a proper and consistent code.
+        The result is reused until the variable database is reloaded or changes size."""
+        if self._coding_context is not None and self._coding_context[0] == len(self.variable_db):
+            return self._coding_context[1]
+        parts = []
         for key in self.variable_db:
             variable_name = self.variable_db[key]["variable_name"]
             variable_desr = self.variable_db[key]["variable_desr"]
             python_code = self.variable_db[key]["python_code"] 
-            context+=f"\n#{variable_name}:{variable_desr}\n{python_code}"               
+            parts.append(f"\n#{variable_name}:{variable_desr}\n{python_code}")
+        context = "".join(parts)
+        self._coding_context = (len(self.variable_db), context)
         return context
                
     async def initialize_coding_agent(self, thread_id="python_code_generation"):
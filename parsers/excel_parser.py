@@ -6,22 +6,268 @@ the MongoDB database using the defined data models.
 """
 
 import os
+import sys
+import datetime
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple, Iterator
 from pathlib import Path
 import pandas as pd
 import openpyxl
-from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils import column_index_from_string
 from openpyxl.utils.cell import coordinate_from_string
 from openpyxl.utils import range_boundaries
+from openpyxl.worksheet._reader import WorkSheetParser
+from openpyxl.xml.constants import SHEET_MAIN_NS
 
-from db.models import Spreadsheet, Cell
+try:
+    # Streaming reader used for the computed values of formula cells
+    from python_calamine import CalamineWorkbook
+except ImportError:  # python-calamine is optional; openpyxl reads the values instead
+    CalamineWorkbook = None
+
+from db.models import Spreadsheet, Cell, utc_now
 from db.database import connect_db
-from parsers.formula_parser import expand_cell_range
+from db.background import flush_writes
+from parsers.formula_parser import COL_LETTERS, expand_cell_range
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# openpyxl release series (major, minor) whose private worksheet parser
+# _SheetXmlParser is written against; other releases are refused
+OPENPYXL_PARSER_SERIES = (3, 1)
+
+# Tag of a cell's cached value in the sheet XML
+_VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+
+
+class SheetCell(NamedTuple):
+    """A non-empty cell read from a sheet, as handed from the sheet readers to the parser."""
+    sheet_name: str
+    row: int  # 1-indexed, as in openpyxl
+    column: int  # 1-indexed, as in openpyxl
+    value: Any  # Stored value, the formula string for formula cells
+    computed_value: Any  # Value of the cell, the cached result for formula cells
+    data_type: str  # openpyxl data type code of the stored value ('f' for formulas)
+    
+    @property
+    def coordinate(self) -> str:
+        """Excel-style coordinate of the cell (e.g. 'B2')."""
+        return f"{COL_LETTERS[self.column]}{self.row}"
+
+
+class SheetData(NamedTuple):
+    """Everything the parser needs from one sheet, read in a single streaming pass."""
+    cells: List[SheetCell]  # Non-empty cells in row order
+    max_row: int  # Last row with a cell element, as the full openpyxl workbook reports it
+    max_column: int  # Last column with a cell element
+    list_validations: List[Tuple[str, str]]  # (formula1, sqref) of the list-type data validations
+
+
+def _open_eval_workbook(file_path: str):
+    """
+    Open the workbook the computed values are read from.
+    
+    Uses python-calamine when it is installed, otherwise a read-only openpyxl
+    workbook loaded with data_only=True.
+    
+    Args:
+        file_path: Path to the Excel file.
+        
+    Returns:
+        A CalamineWorkbook or an openpyxl workbook; both are closed with close().
+    """
+    if CalamineWorkbook is not None:
+        return CalamineWorkbook.from_path(file_path)
+    return openpyxl.load_workbook(file_path, data_only=True, read_only=True)
+
+
+def _from_calamine(value: Any) -> Any:
+    """
+    Convert a value read by python-calamine to the type openpyxl reads it as.
+    
+    Calamine reads every number as a float and date cells as dates, where
+    openpyxl keeps integers as int and reads dates as datetimes.
+    
+    Args:
+        value: Value returned by CalamineSheet.to_python.
+        
+    Returns:
+        The value as openpyxl with data_only=True would return it.
+    """
+    if type(value) is float:
+        return int(value) if value.is_integer() else value
+    if type(value) is datetime.date:
+        return datetime.datetime.combine(value, datetime.time())
+    return value
+
+
+def _read_computed_values(eval_workbook, sheet_name: str) -> Dict[Tuple[int, int], Any]:
+    """
+    Read the computed values of the non-empty cells of a sheet.
+    
+    Args:
+        eval_workbook: Workbook returned by _open_eval_workbook.
+        sheet_name: Name of the sheet to read.
+        
+    Returns:
+        Dictionary mapping (row, column), 1-indexed, to the computed value, with
+        the same types for both readers. Calamine reads error values (e.g.
+        #DIV/0!) as empty, so such cells are missing from its result;
+        _read_sheet_cells takes them from the sheet XML instead.
+    """
+    if CalamineWorkbook is not None and isinstance(eval_workbook, CalamineWorkbook):
+        # Keep the leading empty rows and columns so positions match openpyxl's
+        rows = eval_workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+        return {
+            (row_index, column_index): _from_calamine(value)
+            for row_index, row in enumerate(rows, 1)
+            for column_index, value in enumerate(row, 1)
+            # Calamine reports empty cells as empty strings
+            if value != ""
+        }
+    
+    eval_sheet = eval_workbook[sheet_name]
+    eval_sheet.reset_dimensions()  # Read every stored row, whatever dimensions the file claims
+    return {
+        (cell.row, cell.column): cell.value
+        for row in eval_sheet.iter_rows()
+        for cell in row
+        if cell.value is not None
+    }
+
+
+class _SheetXmlParser(WorkSheetParser):
+    """
+    openpyxl's streaming worksheet parser, bound to a sheet of a read-only workbook.
+    
+    This is the only place that relies on openpyxl internals (the private parser,
+    the sheet's XML source and shared strings, and the workbook's date formats), so
+    the supported openpyxl release is checked here and missing internals raise
+    instead of silently dropping cells or data validations.
+    
+    Formula cells whose cached result is an error (e.g. #DIV/0!) get the error
+    string under the 'error' key, as python-calamine reads such results as empty.
+    
+    Args:
+        workbook: Read-only workbook loaded with data_only=False.
+        sheet_name: Name of the sheet to parse.
+        
+    Raises:
+        RuntimeError: If the installed openpyxl is not a supported release.
+    """
+    
+    def __init__(self, workbook, sheet_name: str):
+        version = tuple(int(part) for part in openpyxl.__version__.split('.')[:2])
+        if version != OPENPYXL_PARSER_SERIES:
+            raise RuntimeError(
+                f"openpyxl {openpyxl.__version__} is not supported by the sheet reader, "
+                f"which needs openpyxl {'.'.join(map(str, OPENPYXL_PARSER_SERIES))}.x"
+            )
+        sheet = workbook[sheet_name]
+        super().__init__(sheet._get_source(), sheet._shared_strings,
+                         data_only=False,
+                         epoch=workbook.epoch,
+                         date_formats=workbook._date_formats,
+                         timedelta_formats=workbook._timedelta_formats)
+        # Set by parse() when it reaches the sheet's dataValidations element
+        self.data_validations = None
+    
+    def parse_cell(self, element):
+        cell = super().parse_cell(element)
+        if cell['data_type'] == 'f' and element.get('t') == 'e':
+            cell['error'] = element.findtext(_VALUE_TAG)
+        return cell
+    
+    def close(self) -> None:
+        """Close the sheet's XML source."""
+        self.source.close()
+    
+    def list_validations(self) -> List[Tuple[str, str]]:
+        """
+        Return the list-type data validations of the sheet; call after parse() is exhausted.
+        
+        Returns:
+            List of (formula1, sqref) of the list validations.
+        """
+        if self.data_validations is None:
+            return []
+        return [(dv.formula1, str(dv.sqref)) for dv in self.data_validations.dataValidation if dv.type == "list"]
+
+
+def _read_sheet_cells(workbook, eval_workbook, sheet_name: str) -> SheetData:
+    """
+    Read the non-empty cells and the list validations of a sheet from read-only workbooks.
+    
+    The sheet XML is parsed once with _SheetXmlParser, which also collects the
+    data validations stored after the cells, so neither cell objects nor a full
+    workbook are built.
+    
+    Args:
+        workbook: Read-only workbook loaded with data_only=False.
+        eval_workbook: Workbook returned by _open_eval_workbook.
+        sheet_name: Name of the sheet to read.
+        
+    Returns:
+        The SheetData of the sheet.
+    """
+    # Collect the computed values of the sheet for formula cells
+    eval_values = _read_computed_values(eval_workbook, sheet_name)
+    
+    cells = []
+    max_row = max_column = 1
+    parser = _SheetXmlParser(workbook, sheet_name)
+    try:
+        for _, row in parser.parse():
+            for cell in row:
+                row_index, column_index = cell['row'], cell['column']
+                # Styled empty cells still count towards the dimensions
+                max_row = max(max_row, row_index)
+                max_column = max(max_column, column_index)
+                value = cell['value']
+                # Skip empty cells
+                if value is None:
+                    continue
+                data_type = cell['data_type']
+                if data_type == 'f':
+                    if not isinstance(value, str):
+                        # Array formulas are read as ArrayFormula objects
+                        value = value.text
+                    # Error results come from the sheet XML, whichever reader is used
+                    computed_value = cell.get('error') or eval_values.get((row_index, column_index))
+                else:
+                    computed_value = value
+                cells.append(SheetCell(sheet_name, row_index, column_index, value, computed_value, data_type))
+    finally:
+        parser.close()
+    return SheetData(cells, max_row, max_column, parser.list_validations())
+
+
+def read_sheet_cells(file_path: str, sheet_name: str) -> SheetData:
+    """
+    Read the non-empty cells and the list validations of one sheet of an Excel file.
+    
+    Opens its own read-only workbook handles, so it can run in a worker process.
+    
+    Args:
+        file_path: Path to the Excel file.
+        sheet_name: Name of the sheet to read.
+        
+    Returns:
+        The SheetData of the sheet.
+    """
+    workbook = openpyxl.load_workbook(file_path, data_only=False, read_only=True)
+    eval_workbook = _open_eval_workbook(file_path)
+    try:
+        return _read_sheet_cells(workbook, eval_workbook, sheet_name)
+    finally:
+        # Read-only workbooks keep the file open until closed
+        workbook.close()
+        eval_workbook.close()
+
+
 class ExcelParser:
     """
     Parser for Excel spreadsheets that populates MongoDB using the Spreadsheet model.
@@ -34,19 +280,31 @@ class ExcelParser:
         spreadsheet: The Spreadsheet document being populated.
     """
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, background_writes: bool = False,
+                 max_workers: Optional[int] = None):
         """
         Initialize the Excel parser with a file path.
         
         Args:
             file_path: Path to the Excel file to parse.
+            background_writes: Whether to queue the cell writes for the background
+                writer thread, so encoding the next batch overlaps the previous write.
+                parse() still waits for the writes and raises if any of them failed.
+            max_workers: Number of processes reading sheets in parallel. Defaults to
+                None, which reads the sheets in-process; each worker re-imports the
+                parser and re-opens the workbook, so only very large workbooks gain.
         """
         self.file_path = file_path
+        self._workbook_name = os.path.basename(file_path)  # Recorded on precedents and validation options
+        self.background_writes = background_writes
+        self.max_workers = max_workers
+        self._validation_options = {}  # (row, column) -> list validation options of the sheet being processed
         self.spreadsheet = None
         self.workbook = None
-        self.eval_workbook = None
+        self._style_workbook = None  # Full workbook, loaded by get_cell_style on demand
         self.alias_mapping = {}
         self.reverse_alias_mapping = {}  # Maps aliases to cell references
+        self.parse_timestamp = None  # Shared created/updated/accessed time of the parsed cells
     
     def parse(self) -> Spreadsheet:
         """
@@ -56,9 +314,10 @@ class ExcelParser:
             The populated Spreadsheet document.
         """
         logger.info(f"Parsing Excel file: {self.file_path}")
+        self.parse_timestamp = utc_now()
         
         # Check if this spreadsheet already exists in the database
-        filename = os.path.basename(self.file_path)
+        filename = self._workbook_name
         existing_spreadsheet = Spreadsheet.objects(file_path=self.file_path).first()
         
         if existing_spreadsheet:
@@ -74,77 +333,114 @@ class ExcelParser:
                 file_path=self.file_path
             )
         
-        # Open the workbook
-        self.workbook = openpyxl.load_workbook(self.file_path, data_only=False)
-        # Load workbook with data_only to get computed values for formula cells
-        self.eval_workbook = openpyxl.load_workbook(self.file_path, data_only=True)
-        
-        # Build alias mapping from defined names
-        self._build_alias_mapping()
-        
-        # Get sheet names and set active sheet
-        self.spreadsheet.sheet_names = self.workbook.sheetnames
-        self.spreadsheet.active_sheet = self.workbook.active.title
-        
-        # Process each sheet
-        for sheet_name in self.workbook.sheetnames:
-            self._process_sheet(sheet_name)
+        # Open the workbook read-only; it provides the sheet names and defined names,
+        # and the sheets are streamed from it by _read_sheets
+        self.workbook = openpyxl.load_workbook(self.file_path, data_only=False, read_only=True)
+        try:
+            # Build alias mapping from defined names
+            self._build_alias_mapping()
+            
+            # Get sheet names and set active sheet
+            sheet_names = self.workbook.sheetnames
+            self.spreadsheet.sheet_names = sheet_names
+            self.spreadsheet.active_sheet = self.workbook.active.title
+            
+            # Read the sheets, then process each sheet; the records of a sheet
+            # are released once its Cell documents are built
+            for sheet_name, sheet_data in zip(sheet_names, self._read_sheets(sheet_names)):
+                self._process_sheet(sheet_name, sheet_data)
+                del sheet_data
+        finally:
+            # Read-only workbooks keep the file open until closed
+            self.workbook.close()
         
         # Log summary of cells processed
         total_cells = len(self.spreadsheet.cells)
-        logger.info(f"Total cells processed: {total_cells} from {len(self.workbook.sheetnames)} sheets")
+        logger.info(f"Total cells processed: {total_cells} from {len(sheet_names)} sheets")
         
-        # Save the populated spreadsheet to the database first
-        self.spreadsheet.save()
-        
-        # Process cell dependencies after all cells are saved
+        # Process cell dependencies after all cells are created; this only
+        # updates the in-memory cells, nothing is written yet
         self._process_cell_dependencies()
         
-        # Save again after processing dependencies
+        # Save the spreadsheet once so cells can reference it, then bulk write
+        # the cells; cells of an existing spreadsheet are upserted in place
         self.spreadsheet.save()
+        if existing_spreadsheet:
+            self.spreadsheet.upsert_cells(since=self.parse_timestamp, background=self.background_writes)
+        else:
+            self.spreadsheet.save_cells(background=self.background_writes)
+        if self.background_writes:
+            flush_writes()
         
         logger.info(f"Completed parsing: {self.file_path}")
         return self.spreadsheet
     
-    def _process_sheet(self, sheet_name: str) -> None:
+    def _read_sheets(self, sheet_names: List[str]) -> Iterator[SheetData]:
+        """
+        Read the non-empty cells and list validations of each sheet.
+        
+        Sheets are read in-process unless max_workers is above 1; then each sheet
+        is read by a worker process with its own workbook handle. Sheets are yielded
+        one at a time, so only the sheets not yet consumed are held in memory.
+        
+        Args:
+            sheet_names: Names of the sheets to read.
+            
+        Yields:
+            The SheetData of each sheet, in the order of sheet_names.
+        """
+        max_workers = min(self.max_workers or 1, len(sheet_names))
+        if max_workers <= 1:
+            # Read in-process, sharing parse()'s workbook and one eval workbook across the sheets
+            eval_workbook = _open_eval_workbook(self.file_path)
+            try:
+                for name in sheet_names:
+                    yield _read_sheet_cells(self.workbook, eval_workbook, name)
+            finally:
+                eval_workbook.close()
+            return
+        
+        # Spawn rather than fork: the parent may hold MongoDB and logging threads
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            yield from executor.map(read_sheet_cells, [self.file_path] * len(sheet_names), sheet_names)
+    
+    def _process_sheet(self, sheet_name: str, sheet_data: SheetData) -> None:
         """
         Process a single sheet in the workbook.
         
         Args:
             sheet_name: Name of the sheet to process.
+            sheet_data: The cells and list validations of the sheet, from _read_sheets.
         """
         logger.info(f"Processing sheet: {sheet_name}")
-        sheet = self.workbook[sheet_name]
+        sheet_cells = sheet_data.cells
         
         # Add sheet metadata to the spreadsheet document
         if 'sheets_metadata' not in self.spreadsheet.metadata:
             self.spreadsheet.metadata['sheets_metadata'] = {}
         
         self.spreadsheet.metadata['sheets_metadata'][sheet_name] = {
-            'max_row': sheet.max_row,
-            'max_column': sheet.max_column
+            'max_row': sheet_data.max_row,
+            'max_column': sheet_data.max_column
         }
         
-        logger.info(f"Sheet {sheet_name} dimensions: {sheet.max_row} rows x {sheet.max_column} columns")
+        logger.info(f"Sheet {sheet_name} dimensions: {sheet_data.max_row} rows x {sheet_data.max_column} columns")
         
-        # Process each non-empty cell
-        cells_processed = 0
-        for row_idx in range(1, sheet.max_row + 1):
-            for col_idx in range(1, sheet.max_column + 1):
-                cell = sheet.cell(row=row_idx, column=col_idx)
-                
-                # Skip empty cells
-                if cell.value is None:
-                    continue
-                
-                # Create and add the cell document
-                cell_doc = self._create_cell_document(cell, row_idx-1, col_idx-1, sheet_name)
-                self.spreadsheet.cells.append(cell_doc)
-                cells_processed += 1
+        # Resolve the list validations of the sheet once rather than per cell
+        self._validation_options = self._build_validation_map(sheet_name, sheet_data)
+        
+        # Create the document of each non-empty cell, then add them to the spreadsheet at once
+        cell_docs = [
+            self._create_cell_document(cell, cell.row-1, cell.column-1, sheet_name)
+            for cell in sheet_cells
+        ]
+        self.spreadsheet.cells.extend(cell_docs)
                 
-        logger.info(f"Processed {cells_processed} non-empty cells in sheet {sheet_name}")
+        self._validation_options = {}
+        logger.info(f"Processed {len(cell_docs)} non-empty cells in sheet {sheet_name}")
 
-    def get_cell_type(self, cell: openpyxl.cell.Cell) -> str:
+    def get_cell_type(self, cell: SheetCell) -> str:
         """
         Determine the type of cell content.
         - 'formula' if the cell contains a formula.
@@ -153,75 +449,105 @@ class ExcelParser:
         """
         if cell.value is None:
             return None  # Skip empty cells.
-        if isinstance(cell.value, str) and cell.value.startswith('='):
+        # openpyxl marks formula cells while reading, no need to inspect the value
+        if cell.data_type == 'f':
             return 'formula'
         
-        # Check if the cell has data validation with a list
-        validation_options = self._get_validation_options(cell)
-        if validation_options:  # Now a list of dictionaries, but empty list still means no validation
+        if isinstance(cell.value, list):
             return 'valuelist'
-        elif isinstance(cell.value, list):
+        
+        # Check if the cell has data validation with a list; most sheets have none
+        if self._validation_options and self._get_validation_options(cell):
             return 'valuelist'
-        else:
-            return 'value'
+        return 'value'
     
-    def _get_validation_options(self, cell: openpyxl.cell.Cell) -> List[Dict[str, str]]:
+    def _get_validation_options(self, cell: SheetCell) -> List[Tuple[str, str, str]]:
         """
         Extract data validation options for a cell if it has list-type validation.
         
         Args:
-            cell: The openpyxl Cell object.
+            cell: The cell read from the sheet.
             
         Returns:
-            List of validation option dictionaries if the cell has list validation, empty list otherwise.
-            Each dictionary contains workbook_name, sheet_name, and cell_ref.
+            List of validation options if the cell has list validation, empty list otherwise.
+            Each option is a (workbook_name, sheet_name, cell_ref) tuple.
         """
-        worksheet = cell.parent
-        cell_address = cell.coordinate
-        workbook_name = os.path.basename(self.file_path)
-        current_sheet_name = worksheet.title
-        
-        for dv in worksheet.data_validations.dataValidation:
-            # Check if dv.sqref has 'ranges' (MultiCellRange) or is a string.
-            if hasattr(dv.sqref, 'ranges'):
-                ranges = dv.sqref.ranges
-            else:
-                ranges = dv.sqref.split()
+        # Looked up in the map built for the sheet by _build_validation_map
+        return self._validation_options.get((cell.row, cell.column), [])
+    
+    def _build_validation_map(self, sheet_name: str,
+                              sheet_data: SheetData) -> Dict[Tuple[int, int], List[Tuple[str, str, str]]]:
+        """
+        Map the cells of a sheet covered by a list-type data validation to its options.
+        
+        A cell covered by several list validations gets the options of the first one,
+        and the options of identical rules are only parsed once.
+        
+        Args:
+            sheet_name: Name of the sheet.
+            sheet_data: The cells and list validations of the sheet.
+            
+        Returns:
+            Dictionary mapping (row, column), 1-indexed, to the validation options.
+        """
+        sheet_cells = sheet_data.cells
+        validation_map = {}
+        parsed_options = {}  # formula1 -> options
+        
+        for formula1, sqref in sheet_data.list_validations:
+            if formula1 not in parsed_options:
+                parsed_options[formula1] = self._parse_validation_options(formula1, sheet_name)
+            options = parsed_options[formula1]
+            
+            # sqref is a space-separated list of ranges
+            for cell_range in sqref.split():
+                min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+                
+                if None in (min_col, min_row, max_col, max_row) or \
+                        (max_col - min_col + 1) * (max_row - min_row + 1) > len(sheet_cells):
+                    # Whole rows/columns or ranges larger than the sheet's content:
+                    # only look at the cells that exist
+                    for cell in sheet_cells:
+                        if (min_col is None or min_col <= cell.column) and \
+                                (max_col is None or cell.column <= max_col) and \
+                                (min_row is None or min_row <= cell.row) and \
+                                (max_row is None or cell.row <= max_row):
+                            validation_map.setdefault((cell.row, cell.column), options)
+                else:
+                    for row in range(min_row, max_row + 1):
+                        for column in range(min_col, max_col + 1):
+                            validation_map.setdefault((row, column), options)
+        
+        return validation_map
+    
+    def _parse_validation_options(self, formula: str, sheet_name: str) -> List[Tuple[str, str, str]]:
+        """
+        Expand the formula of a list-type data validation into its option cells.
+        
+        Args:
+            formula: The dv.formula1 of the validation, e.g. '"Option1,Option2,Option3"'.
+            sheet_name: Name of the sheet the validation belongs to.
             
-            for cell_range in ranges:
-                if self._cell_in_range(cell_address, cell_range):
-                    if dv.type == "list":
-                        # The options are stored in dv.formula1, e.g. '"Option1,Option2,Option3"'
-                        formula = dv.formula1
-                        # Remove surrounding quotes if present
-                        if formula.startswith('"') and formula.endswith('"'):
-                            formula = formula[1:-1]
-                        options = formula.split(',')
-                        expanded_options = []
-                        for option in options:
-                            option = option.strip()
-                            if '!' in option:
-                                sheet_name_option, range_part = option.split('!', 1)
-                                cell_refs = expand_cell_range(range_part)
-                                for cell_ref in cell_refs:
-                                    clean_cell_ref = cell_ref.replace('$', '')
-                                    expanded_options.append({
-                                        "cell_ref": clean_cell_ref,
-                                        "sheet_name": sheet_name_option,
-                                        "workbook_name": workbook_name
-                                    })
-                            else:
-                                cell_refs = expand_cell_range(option)
-                                for cell_ref in cell_refs:
-                                    clean_cell_ref = cell_ref.replace('$', '')
-                                    expanded_options.append({
-                                        "cell_ref": clean_cell_ref,
-                                        "sheet_name": current_sheet_name,
-                                        "workbook_name": workbook_name
-                                    })
-                        logger.info(f"Expanded options: {expanded_options}")
-                        return expanded_options
-        return []
+        Returns:
+            List of (workbook_name, sheet_name, cell_ref) option tuples.
+        """
+        workbook_name = self._workbook_name
+        # Remove surrounding quotes if present
+        if formula.startswith('"') and formula.endswith('"'):
+            formula = formula[1:-1]
+        options = formula.split(',')
+        expanded_options = []
+        for option in options:
+            option = option.strip()
+            if '!' in option:
+                sheet_name_option, range_part = option.split('!', 1)
+            else:
+                sheet_name_option, range_part = sheet_name, option
+            for cell_ref in expand_cell_range(range_part):
+                clean_cell_ref = cell_ref.replace('$', '')
+                expanded_options.append((workbook_name, sheet_name_option, clean_cell_ref))
+        logger.info(f"Expanded options: {expanded_options}")
+        return expanded_options
     
     def _cell_in_range(self, cell, cell_range):
         """
@@ -258,10 +584,13 @@ class ExcelParser:
         self.reverse_alias_mapping = {}  # Maps aliases to cell references
         
         for alias, defined_name in self.workbook.defined_names.items():
+            # Interned, since aliases are looked up for every formula input
+            alias = sys.intern(alias)
             for sheet_name, cell_range in defined_name.destinations:
                 cell_range_clean = cell_range.replace('$', '')
                 if ':' in cell_range_clean:
                     continue  # skip ranges
+                cell_range_clean = sys.intern(cell_range_clean)
                 
                 # Add to forward mapping (cell_ref -> alias)
                 self.alias_mapping.setdefault(sheet_name, {})[cell_range_clean] = alias
@@ -275,13 +604,13 @@ class ExcelParser:
         total_aliases = sum(len(sheet_aliases) for sheet_aliases in self.alias_mapping.values())
         logger.info(f"Found {total_aliases} cell aliases across {len(self.alias_mapping)} sheets")
 
-    def _create_cell_document(self, excel_cell: openpyxl.cell.Cell, 
+    def _create_cell_document(self, excel_cell: SheetCell, 
                               row: int, column: int, sheet_name: str) -> Cell:
         """
         Create a Cell document from an Excel cell.
         
         Args:
-            excel_cell: The openpyxl Cell object.
+            excel_cell: The cell read from the sheet.
             row: The 0-indexed row number.
             column: The 0-indexed column number.
             sheet_name: The name of the sheet.
@@ -289,7 +618,7 @@ class ExcelParser:
         Returns:
             A populated Cell document.
         """
-        cell_ref = f"{get_column_letter(column+1)}{row+1}"
+        cell_ref = f"{COL_LETTERS[column+1]}{row+1}"
         
         # Determine cell type
         cell_type = self.get_cell_type(excel_cell)
@@ -298,12 +627,8 @@ class ExcelParser:
         formula = None
         if cell_type == "formula":
             formula = excel_cell.value
-            # Get computed value from eval_workbook
-            eval_ws = self.eval_workbook[sheet_name]
-            eval_cell = eval_ws.cell(row=excel_cell.row, column=excel_cell.column)
-            computed_value = eval_cell.value
-        else:
-            computed_value = excel_cell.value
+        # Computed value from the data_only workbook for formula cells
+        computed_value = excel_cell.computed_value
         
         # Determine data type based on computed value
         data_type = type(computed_value).__name__
@@ -340,9 +665,9 @@ class ExcelParser:
             data_type=data_type,
             cell_type=cell_type,
             value_list=validation_options,  # Store validation options in the value_list field
-            metadata={
-                "style": self._extract_cell_style(excel_cell)
-            }
+            created_at=self.parse_timestamp,
+            updated_at=self.parse_timestamp,
+            accessed_at=self.parse_timestamp
         )
         
         return cell_doc
@@ -350,43 +675,67 @@ class ExcelParser:
     def _process_cell_dependencies(self) -> None:
         """
         Process all cells in the spreadsheet to establish precedents and dependents.
-        This should be called after all cells have been created and saved to the database.
+        This should be called after all cells have been created, before they are written.
         """
         logger.info("Processing cell dependencies...")
         
         # Import the formula parser function
         from parsers.formula_parser import update_cell_dependencies
         
-        # Get the workbook name from the file path
-        workbook_name = os.path.basename(self.file_path)
-        
         # Process each cell with a formula
         cells_with_formulas = [cell for cell in self.spreadsheet.cells if cell.formula]
         logger.info(f"Found {len(cells_with_formulas)} cells with formulas")
         
         # Clear all existing precedents and dependents first
         for cell in self.spreadsheet.cells:
-            cell.precedent_cells = []
-            cell.dependent_cells = []
-            cell.formula_inputs = []
+            cell.clear_dependencies()
         
-        # Now process each cell with a formula
+        # Ensure every formula cell has a sheet_name before the cells are indexed
         for cell in cells_with_formulas:
-            # Ensure cell has a sheet_name
             if not cell.sheet_name:
                 cell.sheet_name = self.spreadsheet.active_sheet
-                
+        
+        # Index the cells once for all formulas; unlike get_cell_by_reference this
+        # does not record the lookups as accesses. Keys use the same resolved sheet
+        # names as update_cell_dependencies, whatever the case of the formulas
+        resolve_sheet_name = self.spreadsheet.resolve_sheet_name
+        cell_index = {}
+        for cell in self.spreadsheet.cells:
+            cell_index.setdefault((resolve_sheet_name(cell.sheet_name), cell.cell_reference), cell)
+        
+        # Now process each cell with a formula
+        for cell in cells_with_formulas:
             # Update dependencies for this cell, passing the workbook name and alias mapping
             update_cell_dependencies(
                 self.spreadsheet, 
                 cell, 
-                workbook_name, 
-                reverse_alias_mapping=self.reverse_alias_mapping
+                self._workbook_name, 
+                reverse_alias_mapping=self.reverse_alias_mapping,
+                cell_index=cell_index
             )
             
         logger.info("Cell dependency processing complete")
     
-    def _extract_cell_style(self, excel_cell: openpyxl.cell.Cell) -> Dict[str, Any]:
+    def get_cell_style(self, sheet_name: str, cell_reference: str) -> Dict[str, Any]:
+        """
+        Get the style of a cell, read from the Excel file on demand.
+        
+        Styles are not stored with the cells during parsing; the full workbook
+        is only loaded on the first call.
+        
+        Args:
+            sheet_name: Name of the sheet containing the cell.
+            cell_reference: Excel-style cell reference (e.g., "A1", "B2").
+            
+        Returns:
+            Dictionary containing style information.
+        """
+        if self._style_workbook is None:
+            self._style_workbook = openpyxl.load_workbook(self.file_path, data_only=False)
+        return self._extract_cell_style(self._style_workbook[sheet_name][cell_reference])
+    
+    @staticmethod
+    def _extract_cell_style(excel_cell: openpyxl.cell.Cell) -> Dict[str, Any]:
         """
         Extract style information from an Excel cell.
         
@@ -433,7 +782,8 @@ def fix_missing_sheet_names(spreadsheet_name: str = None) -> int:
     Fix any cells in the database that are missing the sheet_name field.
     
     This is a migration helper for spreadsheets that were created before
-    the sheet_name field was added directly to the Cell model.
+    the sheet_name field was added directly to the Cell model. Cells still
+    embedded in a spreadsheet document are moved to the cells collection first.
     
     Args:
         spreadsheet_name: Optional name of a specific spreadsheet to fix.
@@ -464,6 +814,9 @@ def fix_missing_sheet_names(spreadsheet_name: str = None) -> int:
     for spreadsheet in spreadsheets:
         logger.info(f"Processing spreadsheet: {spreadsheet.name}")
         
+        # Legacy documents keep their cells in an embedded array
+        spreadsheet.migrate_embedded_cells()
+        
         # Default to the active sheet if it exists
         default_sheet = spreadsheet.active_sheet or (
             spreadsheet.sheet_names[0] if spreadsheet.sheet_names else "Sheet1"
@@ -492,6 +845,7 @@ def fix_missing_sheet_names(spreadsheet_name: str = None) -> int:
         # Save the spreadsheet if any cells were fixed
         if fixed_count > 0:
             spreadsheet.save()
+            spreadsheet.save_cells()
             logger.info(f"Fixed {fixed_count} cells in {spreadsheet.name}")
     
     return fixed_count
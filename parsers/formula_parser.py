@@ -1,7 +1,48 @@
 import formulas
+import logging
 from typing import Dict, List, Optional, Tuple
 from db.models import Cell, Spreadsheet
 import re
+from functools import lru_cache
+from itertools import product
+from openpyxl.utils import get_column_letter, column_index_from_string
+
+logger = logging.getLogger(__name__)
+
+# Column and row of a single cell reference, capturing the optional $ anchors of each
+_REF_RE = re.compile(r'(\$?)([A-Z]+)(\$?)(\d+)')
+
+# Column letters by 1-based column index, up to Excel's last column (XFD)
+COL_LETTERS = [None] + [get_column_letter(i) for i in range(1, 16385)]
+
+# Shared formula parser; Parser.ast keeps no state between calls
+_PARSER = formulas.Parser()
+
+# Functions whose inputs are exactly the references in their arguments, so formulas
+# using only these can be resolved without formulas.Parser. Functions that build or
+# return references (INDIRECT, OFFSET, INDEX, ...) are left to the full parser
+SIMPLE_FUNCTIONS = frozenset([
+    'ABS', 'ACOS', 'AND', 'ASIN', 'ATAN', 'ATAN2', 'AVERAGE', 'AVERAGEIF', 'AVERAGEIFS',
+    'CEILING', 'COS', 'COUNT', 'COUNTA', 'COUNTIF', 'COUNTIFS', 'DEGREES', 'EXP',
+    'FLOOR', 'HLOOKUP', 'IF', 'IFERROR', 'INT', 'LN', 'LOG', 'LOG10', 'MATCH', 'MAX',
+    'MIN', 'MOD', 'NOT', 'OR', 'PI', 'POWER', 'PRODUCT', 'RADIANS', 'ROUND',
+    'ROUNDDOWN', 'ROUNDUP', 'SIGN', 'SIN', 'SQRT', 'SUM', 'SUMIF', 'SUMIFS',
+    'SUMPRODUCT', 'TAN', 'VLOOKUP',
+])
+
+# Tokens of the simple formulas resolved without formulas.Parser: function calls,
+# (optionally sheet-qualified) cell references and ranges, numbers and operators
+_FORMULA_TOKEN_RE = re.compile(r"""
+    (?P<func>[A-Za-z_][\w.]*\()
+  | (?P<ref>(?:[A-Za-z_][\w.]*!)?\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)(?![\w.!(])
+  | (?P<number>\d+(?:\.\d+)?(?![\w.]))
+  | (?P<close>\))
+  | (?P<comma>,)
+  | (?P<percent>%)
+  | (?P<op><=|>=|<>|[-+*/^&=<>(])
+  | (?P<space>\s+)
+""", re.VERBOSE)
+_CELL_PART_RE = re.compile(r'\$?([A-Za-z]{1,3})\$?(\d+)')
 
 def expand_cell_range(range_ref: str) -> List[str]:
     """
@@ -13,51 +54,38 @@ def expand_cell_range(range_ref: str) -> List[str]:
     Returns:
         List of individual cell references in the range
     """
+    return list(_expand_cell_range(range_ref))
+
+@lru_cache(maxsize=4096)
+def _expand_cell_range(range_ref: str) -> Tuple[str, ...]:
+    """Cached implementation of expand_cell_range; the same ranges recur across formulas."""
     # Handle sheet-qualified ranges (e.g., "Sheet1!B1:C10")
     sheet_name = None
     if '!' in range_ref:
         sheet_name, range_ref = range_ref.split('!')
-        sheet_name = sheet_name.lower()
     
     # Split the range into start and end cells
     start_cell, end_cell = range_ref.split(':')
     
-    # Extract column letters and row numbers, handling $ signs
-    start_col = re.match(r'\$?([A-Z]+)', start_cell).group(1)
-    start_row = int(re.match(r'\$?[A-Z]+\$?(\d+)', start_cell).group(1))
-    end_col = re.match(r'\$?([A-Z]+)', end_cell).group(1)
-    end_row = int(re.match(r'\$?[A-Z]+\$?(\d+)', end_cell).group(1))
-    
-    # Convert column letters to numbers (A=1, B=2, ..., Z=26, AA=27, etc.)
-    def col_to_num(col: str) -> int:
-        num = 0
-        for c in col:
-            num = num * 26 + (ord(c) - ord('A') + 1)
-        return num
-    
-    # Convert numbers back to column letters
-    def num_to_col(num: int) -> str:
-        col = ''
-        while num > 0:
-            num, remainder = divmod(num - 1, 26)
-            col = chr(65 + remainder) + col
-        return col
-    
-    start_col_num = col_to_num(start_col)
-    end_col_num = col_to_num(end_col)
-    
-    # Generate all cell references in the range
-    cells = []
-    for col_num in range(start_col_num, end_col_num + 1):
-        for row in range(start_row, end_row + 1):
-            # Preserve $ signs from original reference if present
-            col_prefix = '$' if '$' in start_cell.split(str(start_row))[0] else ''
-            row_prefix = '$' if f'${start_row}' in start_cell else ''
-            cell_ref = f"{col_prefix}{num_to_col(col_num)}{row_prefix}{row}"
-            if sheet_name:
-                cell_ref = f"{sheet_name}!{cell_ref}"
-            cells.append(cell_ref)
-    return cells
+    # Extract column letters, row numbers and the $ anchors of the start cell
+    col_prefix, start_col, row_prefix, start_row = _REF_RE.match(start_cell).groups()
+    _, end_col, _, end_row = _REF_RE.match(end_cell).groups()
+    
+    # Preserve $ signs from original reference if present
+    prefix = f"{sheet_name}!{col_prefix}" if sheet_name else col_prefix
+    
+    return _build_refs(
+        column_index_from_string(start_col), column_index_from_string(end_col),
+        int(start_row), int(end_row), prefix, row_prefix
+    )
+
+def _build_refs(start_col: int, end_col: int, start_row: int, end_row: int,
+                col_prefix: str, row_prefix: str) -> Tuple[str, ...]:
+    """Build the references of a rectangular range, column by column."""
+    # Format each column and each row once, then only concatenate per cell
+    columns = [f"{col_prefix}{COL_LETTERS[col_num]}{row_prefix}" for col_num in range(start_col, end_col + 1)]
+    rows = [str(row) for row in range(start_row, end_row + 1)]
+    return tuple([column + row for column, row in product(columns, rows)])
 
 def extract_formula_inputs(formula: str) -> Dict[str, Optional[str]]:
     """
@@ -67,21 +95,90 @@ def extract_formula_inputs(formula: str) -> Dict[str, Optional[str]]:
         formula: The Excel formula string (should include the leading '=')
         
     Returns:
-        Dictionary mapping cell references to their range objects (or None for non-cell inputs)
+        Dictionary mapping cell references to their range objects (or None for non-cell inputs,
+        and for every input of simple formulas resolved without formulas.Parser)
     """
+    inputs = _simple_formula_inputs(formula)
+    if inputs is not None:
+        return inputs
     try:
-        parser = formulas.Parser()
-        ast_result = parser.ast(formula)
-        if not ast_result or len(ast_result) < 2:
-            return {}
-            
-        func = ast_result[1].compile()
-        return func.inputs
+        return dict(_compile_formula(formula))
     except Exception as e:
         print(f"Error parsing formula {formula}: {str(e)}")
         return {}
 
-def update_cell_dependencies(spreadsheet: Spreadsheet, cell: Cell, workbook_name: str = None, reverse_alias_mapping: Dict[str, Dict[str, str]] = None) -> None:
+def _simple_formula_inputs(formula: str) -> Optional[Dict[str, None]]:
+    """
+    Extract the inputs of a simple formula with a single regex scan.
+    
+    Handles formulas made only of cell references, ranges, numbers, operators and
+    calls of the functions in SIMPLE_FUNCTIONS, which covers most formulas in practice. Inputs are normalized
+    as formulas.Parser does (upper case, no $ anchors, sorted).
+    
+    Args:
+        formula: The Excel formula string (should include the leading '=')
+        
+    Returns:
+        Dictionary mapping the input references to None, or None if the formula
+        uses anything else (names, strings, whole rows/columns, other functions, ...)
+        and needs the full parser.
+    """
+    if not formula.startswith('='):
+        return None
+    
+    refs = set()
+    depth = 0
+    previous = 'op'  # Kind of the last non-space token
+    position = 1
+    end = len(formula)
+    while position < end:
+        match = _FORMULA_TOKEN_RE.match(formula, position)
+        if match is None:
+            return None
+        position = match.end()
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        
+        operand_start = kind in ('func', 'ref', 'number') or match.group() == '('
+        if operand_start and previous in ('ref', 'number', 'close', 'percent'):
+            # Two operands in a row, e.g. the range intersection operator
+            return None
+        if kind == 'func' and match.group()[:-1].upper() not in SIMPLE_FUNCTIONS:
+            return None
+        if kind == 'func' or match.group() == '(':
+            depth += 1
+            kind = 'func' if kind == 'func' else 'op'
+        elif kind == 'close':
+            depth -= 1
+            if depth < 0:
+                return None
+        elif kind == 'comma' and depth == 0:
+            return None
+        elif kind == 'ref':
+            ref = match.group().replace('$', '').upper()
+            for column, row in _CELL_PART_RE.findall(ref.rsplit('!', 1)[-1]):
+                if column_index_from_string(column) > 16384 or not 0 < int(row) <= 1048576:
+                    return None
+            refs.add(ref)
+        previous = kind
+    
+    if depth != 0 or previous not in ('ref', 'number', 'close', 'percent'):
+        return None
+    return dict.fromkeys(sorted(refs))
+
+@lru_cache(maxsize=8192)
+def _compile_formula(formula: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Cached parse of a formula into its inputs; formulas are often copied down whole columns."""
+    ast_result = _PARSER.ast(formula)
+    if not ast_result or len(ast_result) < 2:
+        return ()
+    
+    func = ast_result[1].compile()
+    return tuple(func.inputs.items())
+
+def update_cell_dependencies(spreadsheet: Spreadsheet, cell: Cell, workbook_name: str = None, reverse_alias_mapping: Dict[str, Dict[str, str]] = None,
+                             cell_index: Optional[Dict[Tuple[str, str], Cell]] = None) -> None:
     """
     Update the dependencies for a cell containing a formula.
     This includes:
@@ -89,19 +186,38 @@ def update_cell_dependencies(spreadsheet: Spreadsheet, cell: Cell, workbook_name
     2. Adding these as precedents to the current cell
     3. Adding the current cell as a dependent to each input cell
     
+    Only the in-memory cells are updated; nothing is written to the database, so
+    the caller saves the cells once after all formulas have been processed.
+    
     Args:
         spreadsheet: The Spreadsheet document containing the cell
         cell: The Cell document containing the formula
         workbook_name: The name of the workbook containing the cell
         reverse_alias_mapping: Dictionary mapping aliases to cell references, used for resolving aliases in formulas
+        cell_index: Optional mapping of (sheet_name, cell_reference) to Cell, built once by the caller
+            for all formulas and keyed by the spreadsheet's sheet names. If None, input cells are
+            looked up with spreadsheet.get_cell_by_reference.
+    
+    Sheet names parsed from the formula are mapped to the spreadsheet's sheet names
+    (see Spreadsheet.resolve_sheet_name), so precedents and lookups use the real names.
     """
     if not cell.formula:
         return
+    
+    if cell_index is not None:
+        def find_cell(cell_ref, sheet_name):
+            return cell_index.get((sheet_name, cell_ref))
+    else:
+        find_cell = spreadsheet.get_cell_by_reference
         
     # Extract inputs from the formula
     inputs = extract_formula_inputs(cell.formula)
     
-    # Process each input
+    # Resolve the inputs to (cell_ref, sheet_name) pairs first; a dict keeps the
+    # formula order and drops cells referenced more than once (e.g. =A1+A1*A1)
+    input_cells = {}
+    known_sheets = set(spreadsheet.sheet_names or ())
+    unknown_sheets = set()
     for cell_ref, _ in inputs.items():
         # Skip non-cell inputs (like constants)
         if not cell_ref or cell_ref.isdigit():
@@ -117,42 +233,40 @@ def update_cell_dependencies(spreadsheet: Spreadsheet, cell: Cell, workbook_name
             sheet_name = cell.sheet_name  # Default to the current cell's sheet name
             if '!' in cell_ref:
                 sheet_name, cell_ref = cell_ref.split('!')
+        
+        # Formula parsing changes the case of sheet names, so map them back
+        sheet_name = spreadsheet.resolve_sheet_name(sheet_name)
+        if sheet_name and known_sheets and sheet_name not in known_sheets:
+            unknown_sheets.add(sheet_name)
             
         # Check if this is a range reference (e.g., "B1:C10")
         if ':' in cell_ref:
             # Expand the range into individual cell references
             expanded_cells = expand_cell_range(f"{sheet_name}!{cell_ref}" if sheet_name else cell_ref)
             
-            # Add each cell in the range as a precedent
             for expanded_cell in expanded_cells:
                 exp_sheet_name = sheet_name  # Default to the current sheet name
                 exp_cell_ref = expanded_cell
                 if '!' in expanded_cell:
                     exp_sheet_name, exp_cell_ref = expanded_cell.split('!')
-                
-                # Add the precedent to the current cell
-                cell.add_precedent(exp_cell_ref, exp_sheet_name, workbook_name)
-                cell.formula_inputs.append(exp_cell_ref)
-                
-                # Find the input cell and add current cell as its dependent
-                input_cell = spreadsheet.get_cell_by_reference(exp_cell_ref, exp_sheet_name)
-                if input_cell:
-                    # Ensure the input cell has a sheet_name
-                    if not input_cell.sheet_name:
-                        input_cell.sheet_name = exp_sheet_name
-                    input_cell.add_dependent(cell.cell_reference, cell.sheet_name, workbook_name)
+                input_cells[(exp_cell_ref, exp_sheet_name)] = None
         else:
             # Handle single cell reference
-            cell.add_precedent(cell_ref, sheet_name, workbook_name)
-            cell.formula_inputs.append(cell_ref)
-            
-            # Find the input cell and add current cell as its dependent
-            input_cell = spreadsheet.get_cell_by_reference(cell_ref, sheet_name)
-            if input_cell:
-                # Ensure the input cell has a sheet_name
-                if not input_cell.sheet_name:
-                    input_cell.sheet_name = sheet_name
-                input_cell.add_dependent(cell.cell_reference, cell.sheet_name, workbook_name)
-            
-    # Save the changes
-    spreadsheet.save() 
\ No newline at end of file
+            input_cells[(cell_ref, sheet_name)] = None
+    
+    if unknown_sheets:
+        logger.warning(f"Formula in {cell.sheet_name}!{cell.cell_reference} references unknown sheets "
+                       f"{sorted(unknown_sheets)}; their cells get no dependents")
+    
+    # Add each input as a precedent, and the current cell as its dependent
+    for cell_ref, sheet_name in input_cells:
+        cell.add_precedent(cell_ref, sheet_name, workbook_name)
+        cell.formula_inputs.append(cell_ref)
+        
+        # Find the input cell and add current cell as its dependent
+        input_cell = find_cell(cell_ref, sheet_name)
+        if input_cell:
+            # Ensure the input cell has a sheet_name
+            if not input_cell.sheet_name:
+                input_cell.sheet_name = sheet_name
+            input_cell.add_dependent(cell.cell_reference, cell.sheet_name, workbook_name)
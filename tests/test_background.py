@@ -0,0 +1,22 @@
+"""Tests for the background bulk writer."""
+
+import pytest
+
+from db.background import enqueue_bulk_write, flush_writes
+
+
+class _FailingCollection:
+    name = "cells"
+    
+    def bulk_write(self, operations, ordered=False, bypass_document_validation=False):
+        raise ValueError("write failed")
+
+
+def test_flush_writes_raises_first_background_error():
+    enqueue_bulk_write(_FailingCollection(), ["op"])
+    enqueue_bulk_write(_FailingCollection(), ["op"])
+    
+    with pytest.raises(ValueError, match="write failed"):
+        flush_writes()
+    # The error is reported once
+    flush_writes()
@@ -0,0 +1,39 @@
+"""Tests for the beam calculations of the simple_beam example."""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+# The example is a standalone script directory rather than a package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'examples', 'simple_beam', 'beam_design'))
+
+from calculations import (  # noqa: E402
+    calculate_beam_batch, calculate_demands, calculate_moment, calculate_shear, check_capacity_vec
+)
+
+
+def test_scalar_inputs_return_floats():
+    moment = calculate_moment(10, 20, 50, 10)
+    shear = calculate_shear(10, 20, 50, 10)
+    
+    assert type(moment) is float and type(shear) is float
+    assert moment == 10 * 20 / 4 + 50 * 10 / 1000 * 20 ** 2 / 8
+    assert shear == 10 * 20 / 2 + 50 * 10 / 1000 * 20 / 2
+    assert calculate_demands(10, 20, 50, 10) == (moment, shear)
+    json.dumps({"M": moment, "V": shear})
+
+
+def test_array_inputs_return_arrays():
+    lengths = np.array([10.0, 20.0])
+    moments, shears = calculate_demands(10, lengths, 50, 10)
+    
+    assert isinstance(moments, np.ndarray) and moments.shape == (2,)
+    np.testing.assert_allclose(moments, [calculate_moment(10, length, 50, 10) for length in lengths])
+    np.testing.assert_allclose(shears, [calculate_shear(10, length, 50, 10) for length in lengths])
+    assert calculate_beam_batch(10, 20, 50, 10)[0].shape == ()
+
+
+def test_capacity_check_does_not_round_demands_down():
+    assert check_capacity_vec([50.000001, 50.0], np.array([50, 50], dtype=np.float32)).tolist() == [False, True]
@@ -0,0 +1,148 @@
+"""Tests for the streaming sheet readers of the Excel parser."""
+
+import datetime
+import re
+import zipfile
+from pathlib import Path
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from parsers.excel_parser import _read_computed_values, _read_sheet_cells, read_sheet_cells
+
+# Cached results written into the formula cells, as Excel would store them:
+# reference -> (type attribute, cached value)
+CACHED_RESULTS = {
+    "A2": ("", "6"),
+    "A4": ("", "45294"),
+    "A5": ("", "1.5"),
+    "A6": ("", "45293.5"),
+    "A7": (' t="b"', "1"),
+    "A8": (' t="str"', "x3"),
+    "A9": (' t="e"', "#DIV/0!"),
+}
+
+
+def _write_workbook(path):
+    """Write a workbook whose formula cells have cached results, which openpyxl cannot save."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Calcs"
+    sheet["A1"] = 3
+    sheet["A2"] = "=A1*2"
+    sheet["A3"] = datetime.datetime(2024, 1, 2)
+    sheet["A4"] = "=A3+1"
+    sheet["A4"].number_format = "yyyy-mm-dd"
+    sheet["A5"] = "=A1/2"
+    sheet["A6"] = "=A3+0.5"
+    sheet["A6"].number_format = "yyyy-mm-dd hh:mm"
+    sheet["A7"] = "=A1>1"
+    sheet["A8"] = '="x"&A1'
+    sheet["A9"] = "=A1/0"
+    source = path.with_name("source.xlsx")
+    workbook.save(source)
+    
+    with zipfile.ZipFile(source) as zin, zipfile.ZipFile(path, "w") as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                xml = data.decode()
+                for ref, (type_attr, cached) in CACHED_RESULTS.items():
+                    xml = re.sub(
+                        rf'<c r="{ref}"([^>]*)><f>(.*?)</f><v />',
+                        lambda m: f'<c r="{ref}"{m.group(1)}{type_attr}><f>{m.group(2)}</f><v>{cached}</v>',
+                        xml
+                    )
+                data = xml.encode()
+            zout.writestr(item, data)
+
+
+def _computed_values(path, eval_workbook):
+    """Computed value of every cell of the test sheet, read with the given eval workbook."""
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        sheet_data = _read_sheet_cells(workbook, eval_workbook, "Calcs")
+    finally:
+        workbook.close()
+        eval_workbook.close()
+    return {cell.coordinate: cell.computed_value for cell in sheet_data.cells}
+
+
+def test_calamine_values_match_openpyxl(tmp_path):
+    python_calamine = pytest.importorskip("python_calamine")
+    path = tmp_path / "values.xlsx"
+    _write_workbook(path)
+    
+    expected = _computed_values(path, openpyxl.load_workbook(path, data_only=True, read_only=True))
+    actual = _computed_values(path, python_calamine.CalamineWorkbook.from_path(str(path)))
+    
+    assert len(expected) == 9
+    assert expected["A9"] == "#DIV/0!"
+    assert actual == expected
+    assert {ref: type(value) for ref, value in actual.items()} == \
+        {ref: type(value) for ref, value in expected.items()}
+
+
+def test_computed_values_of_both_readers_match(tmp_path):
+    python_calamine = pytest.importorskip("python_calamine")
+    path = tmp_path / "values.xlsx"
+    _write_workbook(path)
+    
+    # Error results are missing from calamine's values and filled in by _read_sheet_cells
+    openpyxl_workbook = openpyxl.load_workbook(path, data_only=True, read_only=True)
+    calamine_workbook = python_calamine.CalamineWorkbook.from_path(str(path))
+    try:
+        openpyxl_values = _read_computed_values(openpyxl_workbook, "Calcs")
+        calamine_values = _read_computed_values(calamine_workbook, "Calcs")
+    finally:
+        openpyxl_workbook.close()
+        calamine_workbook.close()
+    
+    assert openpyxl_values.pop((9, 1)) == "#DIV/0!"
+    assert calamine_values == openpyxl_values
+
+
+def test_read_sheet_cells_streams_validations_and_dimensions(tmp_path):
+    path = tmp_path / "validations.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Main"
+    sheet["A1"] = "x"
+    sheet["B2"] = "=A1"
+    sheet["C5"].font = Font(bold=True)  # Styled but empty
+    validation = DataValidation(type="list", formula1="$A$1:$A$2")
+    validation.add("A1:A2")
+    validation.add("D1")
+    sheet.add_data_validation(validation)
+    sheet.add_data_validation(DataValidation(type="whole", formula1="0"))
+    workbook.save(path)
+    
+    sheet_data = read_sheet_cells(str(path), "Main")
+    
+    assert [(cell.coordinate, cell.value, cell.data_type) for cell in sheet_data.cells] == [
+        ("A1", "x", "s"), ("B2", "=A1", "f")
+    ]
+    assert (sheet_data.max_row, sheet_data.max_column) == (5, 3)
+    assert sheet_data.list_validations == [("$A$1:$A$2", "A1:A2 D1")]
+
+
+def test_read_sheet_cells_finds_validations_of_the_example_workbook():
+    path = Path(__file__).resolve().parents[1] / "examples" / "simple_beam" / "simple_beam.xlsx"
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    sheet_name = workbook.sheetnames[0]
+    workbook.close()
+    
+    sheet_data = read_sheet_cells(str(path), sheet_name)
+    
+    assert [sqref for _, sqref in sheet_data.list_validations] == ["D7"]
+
+
+def test_unsupported_openpyxl_release_is_refused(tmp_path, monkeypatch):
+    path = tmp_path / "plain.xlsx"
+    openpyxl.Workbook().save(path)
+    monkeypatch.setattr(openpyxl, "__version__", "4.0.0")
+    
+    with pytest.raises(RuntimeError, match="not supported"):
+        read_sheet_cells(str(path), "Sheet")
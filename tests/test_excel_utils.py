@@ -0,0 +1,20 @@
+"""Tests for the Excel address helpers."""
+
+import pytest
+
+from utils.excel import get_excel_tile_bounds
+
+
+@pytest.mark.parametrize("cell", ["D3", "d3", "$D$3", "Sheet1!D3"])
+def test_tile_bounds_accept_cell_address_forms(cell):
+    assert get_excel_tile_bounds(cell, 1) == (3, 5, 2, 4)
+
+
+def test_tile_bounds_are_clamped_to_the_sheet():
+    assert get_excel_tile_bounds("A1", 1) == (1, 2, 1, 2)
+
+
+@pytest.mark.parametrize("cell", ["", "A", "1A", "A1:B2"])
+def test_tile_bounds_reject_invalid_addresses(cell):
+    with pytest.raises(ValueError, match="Invalid cell address"):
+        get_excel_tile_bounds(cell, 1)
@@ -0,0 +1,26 @@
+"""Tests for the packed BSON field."""
+
+import datetime
+
+import pytest
+from mongoengine.errors import ValidationError
+
+from db.models import Cell
+
+
+def test_packed_value_round_trips():
+    cell = Cell(row=1, column=1, cell_reference="A1", sheet_name="Sheet1",
+                value={"raw": 3, "formatted": "3"}, dependent_cells=[{"cell_ref": "B1"}])
+    
+    loaded = Cell._from_son(cell.to_mongo())
+    
+    assert loaded.value == {"raw": 3, "formatted": "3"}
+    assert loaded.dependent_cells == [{"cell_ref": "B1"}]
+
+
+def test_unencodable_value_raises_validation_error():
+    cell = Cell(row=1, column=1, cell_reference="A1", sheet_name="Sheet1",
+                value={"raw": datetime.time(6, 0)})
+    
+    with pytest.raises(ValidationError, match="cannot be packed"):
+        cell.to_mongo()
@@ -0,0 +1,66 @@
+"""Tests for formula dependency tracking between in-memory cells."""
+
+from db.models import Cell, Spreadsheet
+from parsers.formula_parser import _simple_formula_inputs, update_cell_dependencies
+
+
+def _make_spreadsheet():
+    spreadsheet = Spreadsheet(name="test", original_filename="test.xlsx",
+                              sheet_names=["Calcs", "Inputs"], active_sheet="Calcs")
+    cells = [
+        Cell(row=2, column=2, cell_reference="B2", sheet_name="Inputs", value=3),
+        Cell(row=24, column=10, cell_reference="J24", sheet_name="Calcs", value=1),
+        Cell(row=25, column=11, cell_reference="K25", sheet_name="Calcs", value=2),
+        Cell(row=1, column=1, cell_reference="A1", sheet_name="Calcs", formula="=SUM(Calcs!J24:K25)"),
+        Cell(row=2, column=1, cell_reference="A2", sheet_name="Calcs", formula="=Inputs!B2*2"),
+    ]
+    spreadsheet.cells = cells
+    return spreadsheet, {cell.cell_reference: cell for cell in cells}
+
+
+def test_range_precedent_records_dependents():
+    spreadsheet, cells = _make_spreadsheet()
+    update_cell_dependencies(spreadsheet, cells["A1"], "test.xlsx")
+    
+    expected = [{"cell_ref": "A1", "sheet_name": "Calcs", "workbook_name": "test.xlsx"}]
+    assert cells["J24"].dependent_cells == expected
+    assert cells["K25"].dependent_cells == expected
+
+
+def test_cross_sheet_precedent_records_dependents():
+    spreadsheet, cells = _make_spreadsheet()
+    update_cell_dependencies(spreadsheet, cells["A2"], "test.xlsx")
+    
+    assert cells["B2"].dependent_cells == [
+        {"cell_ref": "A2", "sheet_name": "Calcs", "workbook_name": "test.xlsx"}
+    ]
+
+
+def test_sheet_names_resolve_case_insensitively():
+    spreadsheet, cells = _make_spreadsheet()
+    
+    assert spreadsheet.resolve_sheet_name("INPUTS") == "Inputs"
+    assert spreadsheet.resolve_sheet_name("'Inputs'") == "Inputs"
+    assert spreadsheet.resolve_sheet_name("missing") == "missing"
+    assert spreadsheet.get_cell_by_reference("B2", "INPUTS") is cells["B2"]
+
+
+def test_cell_index_lookup_uses_resolved_sheet_names():
+    spreadsheet, cells = _make_spreadsheet()
+    cells["A2"].formula = "=INPUTS!B2+'Inputs'!B2"
+    cell_index = {(cell.sheet_name, cell.cell_reference): cell for cell in spreadsheet.cells}
+    update_cell_dependencies(spreadsheet, cells["A2"], "test.xlsx", cell_index=cell_index)
+    
+    assert cells["A2"].precedent_cells == [
+        {"cell_ref": "B2", "sheet_name": "Inputs", "workbook_name": "test.xlsx"}
+    ]
+    assert cells["B2"].dependent_cells == [
+        {"cell_ref": "A2", "sheet_name": "Calcs", "workbook_name": "test.xlsx"}
+    ]
+
+
+def test_reference_functions_use_the_full_parser():
+    assert list(_simple_formula_inputs("=SUM(A1:B2)+ROUND(C3, 2)")) == ["A1:B2", "C3"]
+    assert _simple_formula_inputs("=INDIRECT(A1)") is None
+    assert _simple_formula_inputs("=SUM(OFFSET(A1,1,1))") is None
+    assert _simple_formula_inputs("=INDEX(A1:B3,2,1)+A1") is None
@@ -0,0 +1,31 @@
+"""Tests for the spreadsheet model."""
+
+from unittest import mock
+
+from bson import ObjectId
+
+from db.models import Spreadsheet, Cell
+
+
+def test_migrate_embedded_cells_moves_legacy_cells():
+    raw = {
+        '_id': ObjectId(), 'name': 'legacy', 'original_filename': 'legacy.xlsx',
+        'active_sheet': 'Sheet1',
+        'cells': [{'row': 1, 'column': 1, 'cell_reference': 'A1', 'value': {'raw': 3}}],
+    }
+    spreadsheet = Spreadsheet._from_son(raw)
+    collection = mock.Mock()
+    
+    with mock.patch.object(Spreadsheet, 'objects') as spreadsheets, \
+            mock.patch.object(Cell, 'objects') as cells, \
+            mock.patch.object(Spreadsheet, '_get_collection', return_value=collection), \
+            mock.patch.object(Spreadsheet, 'save_cells', return_value=1) as save_cells:
+        spreadsheets.return_value.as_pymongo.return_value.first.return_value = raw
+        cells.return_value.count.return_value = 0
+        
+        assert spreadsheet.migrate_embedded_cells() == 1
+    
+    save_cells.assert_called_once()
+    collection.update_one.assert_called_once_with({'_id': raw['_id']}, {'$unset': {'cells': ''}})
+    [cell] = spreadsheet.cells
+    assert (cell.sheet_name, cell.cell_reference, cell.value) == ('Sheet1', 'A1', {'raw': 3})
@@ -1,10 +1,20 @@
+import re
+from functools import lru_cache
+
+# Column letters and row digits of a cell address, ignoring $ anchors
+_CELL_RE = re.compile(r'\$?([A-Za-z]+)\$?(\d+)')
+
+@lru_cache(maxsize=None)
 def col_to_num(col: str) -> int:
     """Convert Excel column letters (e.g. 'AB') to a 1-indexed column number."""
     num = 0
+    _ord = ord
     for c in col:
-        num = num * 26 + (ord(c.upper()) - ord('A') + 1)
+        # The low five bits of an ASCII letter are its 1-based alphabet position, in either case
+        num = num * 26 + (_ord(c) & 0x1F)
     return num
 
+@lru_cache(maxsize=None)
 def num_to_col(num: int) -> str:
     """Convert a 1-indexed column number to Excel column letters (e.g. 28 -> 'AB')."""
     col = ""
@@ -12,28 +22,27 @@ def num_to_col(num: int) -> str:
         num, remainder = divmod(num - 1, 26)
         col = chr(65 + remainder) + col
     return col
-def get_excel_tile(cell: str, distance: int) -> list[list[str]]:
+def get_excel_tile_bounds(cell: str, distance: int) -> tuple[int, int, int, int]:
     """
     Given an Excel cell address (e.g. 'D3' or 'AB12') and a distance,
-    returns a tile (list of lists) of cell addresses within the given
-    distance of the cell. If the region would extend beyond the spreadsheet 
-    edges, it is clamped accordingly.
+    returns the 1-indexed (left, right, top, bottom) column and row bounds
+    of the tile within the given distance of the cell, clamped to the
+    spreadsheet edges. $ anchors and a sheet prefix (e.g. 'Sheet1!$D$3')
+    are ignored, and a ValueError is raised if the address is not a cell.
     
     Example:
-    get_excel_tile('D3', 1) -> [['C2', 'D2', 'E2'], 
-                                ['C3', 'D3', 'E3'], 
-                                ['C4', 'D4', 'E4']]
-    For a corner cell like A1 with distance 1, it returns:
-    [['A1', 'B1'],
-     ['A2', 'B2']]
+    get_excel_tile_bounds('D3', 1) -> (3, 5, 2, 4)
+    get_excel_tile_bounds('A1', 1) -> (1, 2, 1, 2)
     """
     
     MAX_COL = 16384  # Excel's maximum column number (XFD)
     MAX_ROW = 1048576  # Excel's maximum row number
 
     # Split the cell into its column (letters) and row (digits) parts.
-    col_part = "".join(filter(str.isalpha, cell))
-    row_part = "".join(filter(str.isdigit, cell))
+    match = _CELL_RE.fullmatch(cell.rsplit('!', 1)[-1].strip())
+    if match is None:
+        raise ValueError(f"Invalid cell address: {cell!r}")
+    col_part, row_part = match.groups()
     
     center_col = col_to_num(col_part)
     center_row = int(row_part)
@@ -43,17 +52,28 @@ def get_excel_tile(cell: str, distance: int) -> list[list[str]]:
     right = min(MAX_COL, center_col + distance)
     top = max(1, center_row - distance)
     bottom = min(MAX_ROW, center_row + distance)
+    return left, right, top, bottom
+
+def get_excel_tile(cell: str, distance: int) -> list[list[str]]:
+    """
+    Given an Excel cell address (e.g. 'D3' or 'AB12') and a distance,
+    returns a tile (list of lists) of cell addresses within the given
+    distance of the cell. If the region would extend beyond the spreadsheet 
+    edges, it is clamped accordingly.
     
-    # Build the tile as a list of lists.
-    tile = []
-    for r in range(top, bottom + 1):
-        row_cells = []
-        for c in range(left, right + 1):
-            cell_addr = num_to_col(c) + str(r)
-            row_cells.append(cell_addr)
-        tile.append(row_cells)
+    Example:
+    get_excel_tile('D3', 1) -> [['C2', 'D2', 'E2'], 
+                                ['C3', 'D3', 'E3'], 
+                                ['C4', 'D4', 'E4']]
+    For a corner cell like A1 with distance 1, it returns:
+    [['A1', 'B1'],
+     ['A2', 'B2']]
+    """
+    left, right, top, bottom = get_excel_tile_bounds(cell, distance)
+    columns = [num_to_col(c) for c in range(left, right + 1)]
     
-    return tile
+    # Build the tile as a list of lists.
+    return [[col + row for col in columns] for row in map(str, range(top, bottom + 1))]
 
 def get_excel_tile_data(cell_id, sheetname, db,spreadsheet_name,distance =2):
     """
@@ -69,35 +89,35 @@ def get_excel_tile_data(cell_id, sheetname, db,spreadsheet_name,distance =2):
       str: A Markdown formatted table.
     """
     spreadsheet_data = db.get_spreadsheet_data(name=spreadsheet_name,as_dict=True)
-    cell_references = spreadsheet_data['cell_references'][sheetname]
-    nested_list = get_excel_tile(cell_id, distance)
-    # Extract column headers from the first row by taking the alphabetical part.
-    first_row = nested_list[0]
-    columns = [''.join(filter(str.isalpha, cell)) for cell in first_row]
-    
-    # Extract row labels for each row by taking the numeric part of the first cell in each row.
-    row_labels = [''.join(filter(str.isdigit, row[0])) for row in nested_list]
+    # A set, since every address of the tile is checked against it
+    cell_references = set(spreadsheet_data['cell_references'][sheetname])
+    left, right, top, bottom = get_excel_tile_bounds(cell_id, distance)
+    # Column headers and row labels of the tile
+    columns = [num_to_col(c) for c in range(left, right + 1)]
+    row_labels = [str(r) for r in range(top, bottom + 1)]
     
-    # Build header for the markdown table with an empty top-left cell.
-    header_line = "|   | " + " | ".join(columns) + " |"
-    # Create the markdown separator line.
-    separator_line = "|---|" + "|".join(["---"] * len(columns)) + "|"
+    # Fetch the non-empty cells of the tile in one call when the database supports it
+    tile_refs = [f"{col}{row_label}" for row_label in row_labels for col in columns]
+    tile_refs = [cell_ref for cell_ref in tile_refs if cell_ref in cell_references]
+    if hasattr(db, 'get_cells_data'):
+        tile_data = db.get_cells_data(tile_refs, sheetname)
+    else:
+        tile_data = {cell_ref: db.get_cell_data(cell_ref, sheetname) for cell_ref in tile_refs}
     
-    # Start building the output lines.
-    lines = [header_line, separator_line]
+    # Header with an empty top-left cell, then the markdown separator line; the
+    # table is collected as one flat list of parts and joined once
+    parts = ["|   | ", " | ".join(columns), " |\n|---|", "|".join(["---"] * len(columns)), "|"]
     
     # Build each row in the table.
-    for row, row_label in zip(nested_list, row_labels):
+    for row_label in row_labels:
+        parts.append("\n| ")
+        parts.append(row_label)
+        parts.append(" | ")
         # For each cell, get the content or an empty string if not present.
-        cell_values = []
-        for cell_ref in row:
-            if cell_ref in cell_references:
-                cell_data = db.get_cell_data(cell_ref, sheetname)
-                cell_values.append(str(cell_data['value']['raw']))
-            else:
-                cell_values.append("")
-        row_line = f"| {row_label} | " + " | ".join(cell_values) + " |"
-        lines.append(row_line)
+        parts.append(" | ".join([
+            str(cell_data['value']['raw']) if cell_data else ""
+            for cell_data in (tile_data.get(f"{col}{row_label}") for col in columns)
+        ]))
+        parts.append(" |")
     
-    # Join all lines into a single Markdown string.
-    return "\n".join(lines)
\ No newline at end of file
+    return "".join(parts)
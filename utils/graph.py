@@ -2,9 +2,22 @@
 SpreadsheetGraph module for building and visualizing dependency graphs from spreadsheet data.
 """
 
+import shutil
+import subprocess
+from itertools import chain
+from pathlib import Path
+
 import networkx as nx
 import matplotlib.pyplot as plt
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any
+
+# Node count from which visualize(backend="auto") renders with Graphviz
+GRAPHVIZ_MIN_NODES = 500
+
+
+def _dot_quote(text: str) -> str:
+    """Quote a string as a Graphviz DOT identifier."""
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
 
 
 class ComputeGraph:
@@ -34,76 +47,142 @@ class ComputeGraph:
         self.graph = nx.DiGraph()
         self.layers = []
         self.positions = {}
+        self._build_fingerprint = None  # Snapshot of spreadsheet_data the graph was built from
         
     def build_graph(self) -> nx.DiGraph:
         """
         Build the directed graph from spreadsheet data.
         
+        The graph is only rebuilt if the spreadsheet data changed since the last
+        build, judged by its identity and the number of cells of each sheet.
+        
         Returns:
             nx.DiGraph: The constructed graph
         """
-        nodes = set()
-        for sheet_name in self.spreadsheet_data['cell_references']:
-            for cell_ref in self.spreadsheet_data['cell_references'][sheet_name]:
-                # Get detailed cell data from the database
-                cell_data = self.db.get_cell_data(cell_ref, sheet_name)
-                
-                if not cell_data:
-                    continue
-                    
-                precedent_cells = cell_data.get('precedent_cells', [])
-                dependent_cells = cell_data.get('dependent_cells', [])
-                
-                # Create a node name that includes the sheet name and cell reference
-                node_name = f"{cell_data['sheet']}!{cell_ref}"
-                nodes.add(node_name)
-                
-                # Add node if it has any connections
-                if precedent_cells or dependent_cells:
-                    self.graph.add_node(node_name, label=node_name)
-                    
-                # Create edges from each precedent cell to this cell
-                for precedent_cell in precedent_cells:
-                    precedent_node_name = f"{precedent_cell['sheet_name']}!{precedent_cell['cell_ref']}"
-                    if precedent_node_name not in nodes:
-                        self.graph.add_node(precedent_node_name, label=precedent_node_name)
-                        nodes.add(precedent_node_name)
-                    self.graph.add_edge(precedent_node_name, node_name)
+        fingerprint = (
+            id(self.spreadsheet_data),
+            tuple((sheet, len(refs)) for sheet, refs in self.spreadsheet_data['cell_references'].items())
+        )
+        if fingerprint == self._build_fingerprint and self.graph.number_of_nodes():
+            return self.graph
+        if self._build_fingerprint is not None:
+            # Start over, dropping the cells and layers of the previous build
+            self.graph = nx.DiGraph()
+            self.layers = []
+            self.positions = {}
+        self._build_fingerprint = fingerprint
+        
+        results = [self._edges_for_sheet(sheet_name) for sheet_name in self.spreadsheet_data['cell_references']]
+        
+        # Add the nodes of every sheet in sheet order, then all edges at once
+        for nodes_with_attr, _ in results:
+            self.graph.add_nodes_from(nodes_with_attr.items())
+        self.graph.add_edges_from(chain.from_iterable(edges for _, edges in results))
         return self.graph
     
-    def create_layers(self) -> List[List[str]]:
+    def _edges_for_sheet(self, sheet_name: str) -> Tuple[Dict[Tuple[str, str], Dict[str, str]],
+                                                          List[Tuple[Tuple[str, str], Tuple[str, str]]]]:
+        """
+        Collect the nodes and edges contributed by the cells of a sheet.
+        
+        Args:
+            sheet_name: Name of the sheet
+            
+        Returns:
+            Tuple of the nodes with their attributes, in the order they are first
+            seen, and the (precedent, cell) edges
+        """
+        nodes_with_attr = {}
+        edges = []
+        for cell_ref, cell_data in self._iter_sheet_cells(sheet_name):
+            precedent_cells = cell_data.get('precedent_cells') or ()
+            
+            # Nodes are (sheet_name, cell_ref) tuples, labelled "sheet!cell" for visualization;
+            # the cell was looked up by sheet_name, so it is the cell's sheet
+            node_name = (sheet_name, cell_ref)
+            
+            # Add node if it has precedents; cells that only have dependents
+            # are added as the precedents of those dependents
+            if precedent_cells:
+                nodes_with_attr[node_name] = {'label': f"{sheet_name}!{cell_ref}"}
+                
+            # Create edges from each precedent cell to this cell
+            for precedent_cell in precedent_cells:
+                precedent_node_name = (precedent_cell['sheet_name'], precedent_cell['cell_ref'])
+                nodes_with_attr[precedent_node_name] = {
+                    'label': f"{precedent_cell['sheet_name']}!{precedent_cell['cell_ref']}"
+                }
+                edges.append((precedent_node_name, node_name))
+        return nodes_with_attr, edges
+    
+    def _iter_sheet_cells(self, sheet_name: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over the cells of a sheet with their data.
+        
+        Uses a single get_cells_bulk read when the database provides it, and one
+        get_cell_data call per cell reference otherwise.
+        
+        Args:
+            sheet_name: Name of the sheet
+            
+        Yields:
+            Tuple[str, Dict[str, Any]]: The cell reference and the cell data
+        """
+        if hasattr(self.db, 'get_cells_bulk'):
+            for cell_data in self.db.get_cells_bulk(sheet_name):
+                yield cell_data['cell_ref'], cell_data
+            return
+        
+        for cell_ref in self.spreadsheet_data['cell_references'][sheet_name]:
+            # Get detailed cell data from the database
+            cell_data = self.db.get_cell_data(cell_ref, sheet_name)
+            if cell_data:
+                yield cell_ref, cell_data
+    
+    def create_layers(self) -> List[Dict[Tuple[str, str], dict]]:
         """
         Create topological layers of the graph.
         This organizes nodes into layers based on their dependencies.
         
         Returns:
-            List[List[str]]: List of layers, where each layer is a list of node names
+            List[Dict[Tuple[str, str], dict]]: List of layers, where each layer maps the
+            (sheet_name, cell_ref) nodes of the layer to an empty dict
         """
-        # Use topological_generations to get layers of nodes
-        self.layers = list(nx.topological_generations(self.graph))
+        # Kahn's algorithm, one generation at a time as nx.topological_generations
+        # does, collecting each node's layer index and building the layer
+        # dictionaries in the same pass
+        layer_map = {}
+        successors = self.graph.succ
+        indegree = {node: degree for node, degree in self.graph.in_degree() if degree > 0}
+        current = [node for node, degree in self.graph.in_degree() if degree == 0]
         
+        layers = []
+        while current:
+            layer_index = len(layers)
+            layer = {}
+            next_layer = []
+            for node in current:
+                layer_map[node] = layer_index
+                # Nodes already are (sheet, cell) tuples
+                layer[node] = {}
+                for child in successors[node]:
+                    indegree[child] -= 1
+                    if indegree[child] == 0:
+                        next_layer.append(child)
+                        del indegree[child]
+            layers.append(layer)
+            current = next_layer
         
-        # Assign a 'layer' attribute to each node based on its layer index
-        for layer_index, layer in enumerate(self.layers):
-            for node in layer:
-                self.graph.nodes[node]['layer'] = layer_index
-
-        # layers = [
-        #                 [
-        #                     {"sheet_name": sheet, "cell_ref": cell}
-        #                     for sheet, cell in (node.split("!") for node in layer)
-        #                 ]
-        #                 for layer in self.layers
-        #             ]
-
-        layers = [
-            {(sheet, cell): {} for sheet, cell in (node.split("!") for node in layer)} for layer in self.layers
-        ]
+        if indegree:
+            raise nx.NetworkXUnfeasible("Graph contains a cycle or graph changed during iteration")
+        
+        # Assign the 'layer' attribute of every node at once
+        nx.set_node_attributes(self.graph, layer_map, 'layer')
 
         self.layers = layers
         return self.layers
     
-    def compute_layout(self, scale: float = 100) -> Dict[str, Tuple[float, float]]:
+    def compute_layout(self, scale: float = 100) -> Dict[Tuple[str, str], Tuple[float, float]]:
         """
         Compute the layout for the graph visualization using multipartite layout.
         
@@ -111,7 +190,7 @@ class ComputeGraph:
             scale: Scale factor for the layout (default: 100)
             
         Returns:
-            Dict[str, Tuple[float, float]]: Dictionary mapping node names to coordinates
+            Dict[Tuple[str, str], Tuple[float, float]]: Dictionary mapping nodes to coordinates
         """
         # Use multipartite layout which organizes nodes according to their layer
         self.positions = nx.multipartite_layout(self.graph, subset_key="layer", scale=scale)
@@ -124,10 +203,15 @@ class ComputeGraph:
                   font_size: int = 8,
                   scale: float = 0.02,
                   title: str = "Layered Visualization of Dependency Graph",
-                  save_path: Optional[str] = None) -> None:
+                  save_path: Optional[str] = None,
+                  backend: str = "matplotlib") -> None:
         """
         Visualize the dependency graph.
         
+        The matplotlib backend lays out and draws every node in Python, which gets
+        slow for graphs with thousands of cells. The graphviz backend hands the
+        layered graph to Graphviz's dot executable instead and can only save to a file.
+        
         Args:
             figsize: Figure size as (width, height) in inches
             node_color: Color of the nodes
@@ -136,6 +220,8 @@ class ComputeGraph:
             scale: Scale factor for vertical spacing
             title: Title of the graph
             save_path: Path to save the figure (if None, the figure is displayed)
+            backend: "matplotlib", "graphviz", or "auto" to use graphviz for graphs of
+                GRAPHVIZ_MIN_NODES nodes or more when saving and dot is installed
         """
         # Make sure graph is built
         if not self.graph.nodes():
@@ -145,6 +231,18 @@ class ComputeGraph:
         if not self.layers:
             self.create_layers()
             
+        if backend == "auto":
+            use_graphviz = (save_path is not None and shutil.which("dot") is not None
+                            and self.graph.number_of_nodes() >= GRAPHVIZ_MIN_NODES)
+            backend = "graphviz" if use_graphviz else "matplotlib"
+        if backend == "graphviz":
+            if save_path is None:
+                raise ValueError("The graphviz backend requires a save_path")
+            self._render_graphviz(save_path, node_color, font_size, title)
+            return
+        if backend != "matplotlib":
+            raise ValueError(f"Unknown visualization backend: {backend}")
+            
         # Compute layout if not already computed
         if not self.positions:
             self.compute_layout()
@@ -171,6 +269,39 @@ class ComputeGraph:
         else:
             plt.show()
             
+    def _render_graphviz(self, save_path: str, node_color: str, font_size: int, title: str) -> None:
+        """
+        Render the layered graph with Graphviz's dot executable.
+        
+        Each layer is a rank=same subgraph, so layers line up left to right as in
+        the multipartite layout.
+        
+        Args:
+            save_path: Path of the output file; its extension selects the format (default png)
+            node_color: Fill color of the nodes
+            font_size: Size of the font for node labels
+            title: Title of the graph
+        """
+        labels = nx.get_node_attributes(self.graph, 'label')
+        node_ids = {node: _dot_quote(labels.get(node, "!".join(node))) for node in self.graph}
+        
+        parts = [
+            "digraph G {\n  rankdir=LR;\n  labelloc=t;\n",
+            f"  label={_dot_quote(title)};\n",
+            f"  node [style=filled, fillcolor={_dot_quote(node_color)}, fontsize={font_size}];\n",
+        ]
+        for layer_index, layer in enumerate(self.layers):
+            parts.append(f"  subgraph layer_{layer_index} {{ rank=same; ")
+            parts.append(" ".join(f"{node_ids[node]};" for node in layer))
+            parts.append(" }\n")
+        for source, target in self.graph.edges():
+            parts.append(f"  {node_ids[source]} -> {node_ids[target]};\n")
+        parts.append("}\n")
+        
+        output_format = Path(save_path).suffix.lstrip(".") or "png"
+        subprocess.run(["dot", f"-T{output_format}", "-o", str(save_path)],
+                       input="".join(parts), text=True, check=True)
+    
     def get_graph(self) -> nx.DiGraph:
         """
         Get the constructed graph.
@@ -180,11 +311,12 @@ class ComputeGraph:
         """
         return self.graph
         
-    def get_layers(self) -> List[List[str]]:
+    def get_layers(self) -> List[Dict[Tuple[str, str], dict]]:
         """
         Get the topological layers of the graph.
         
         Returns:
-            List[List[str]]: List of layers
+            List[Dict[Tuple[str, str], dict]]: List of layers, where each layer maps the
+            (sheet_name, cell_ref) nodes of the layer to an empty dict
         """
         return self.layers
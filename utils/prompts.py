@@ -0,0 +1,15 @@
+from functools import lru_cache
+
+import yaml
+
+
+@lru_cache(maxsize=8)
+def load_prompt(path: str) -> str:
+    """
+    Load the system prompt from a YAML prompt file (e.g. 'prompts/programmer.yaml').
+
+    The parsed prompt is cached per path, so agents created repeatedly do not
+    re-read and re-parse the file.
+    """
+    with open(path, "r") as f:
+        return yaml.safe_load(f)["prompt"]